@@ -1,13 +1,32 @@
-from flask import Flask
-from flask_restx import Api
-from app.api.v1.users import api as users_ns
-from app.api.v1.amenities import api as amenities_ns
-from app.api.v1.places import api as places_ns
-from app.api.v1.reviews import api as reviews_ns
-
-def create_app():
+from config import get_config
+
+def create_app(config_class=None):
+    # Flask, flask_restx and the API modules are imported here, so
+    # importing the models or the facade alone doesn't pay for them
+    from flask import Flask
+    from flask_restx import Api
+    from app.api.v1.users import api as users_ns
+    from app.api.v1.amenities import api as amenities_ns
+    from app.api.v1.places import api as places_ns
+    from app.api.v1.reviews import api as reviews_ns
+
+    config_class = config_class or get_config()
     app = Flask(__name__)
-    api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API')
+    app.config.from_object(config_class)
+    # The API uses the facade built from it, on the first request
+    app.extensions['hbnb_config'] = config_class
+
+    if app.config['METRICS']:
+        from app.services.metrics import init_app as init_metrics
+        init_metrics(app)
+
+    if app.config['PROFILER']:
+        from app.services.profiler import init_app as init_profiler
+        init_profiler(app)
+
+    swagger = app.config['SWAGGER']
+    api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API',
+              doc='/' if swagger else False, add_specs=swagger)
 
     api.add_namespace(users_ns, path='/api/v1/users')
 
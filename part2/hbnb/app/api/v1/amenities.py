@@ -1,5 +1,11 @@
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import facade
+from app.api.v1.pagination import parse_page_args, page_response
+from app.api.v1.batch import parse_batch, batch_response
+from app.api.v1.fields import parse_fields_args
+from app.models.place import Place
+from app.api.v1.conditional import (
+    entity_validators, collection_validators, is_not_modified, not_modified, with_validators)
 from flask import jsonify
 
 api = Namespace("amenities", description='Amenity operations')
@@ -31,23 +37,61 @@ class AmenityList(Resource):
         return new_amenity.to_dict(), 201
 
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(304, "Not modified since the client's copy")
+    @api.response(400, 'Invalid pagination parameters')
     @api.response(404, "No amenities found")
+    @api.param('limit', 'Maximum number of amenities per page')
+    @api.param('cursor', "Opaque cursor taken from the previous page's Link header")
     def get(self):
         """Retrieve a list of all amenities"""
 
+        try:
+            page = parse_page_args()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        # Conditional GET, answered before serializing anything
+        validators = collection_validators(*facade.get_collection_version('amenities'))
+        if is_not_modified(*validators):
+            return not_modified(*validators)
+
+        # Paginated mode, only when the client asks for it
+        if page:
+            amenities, next_key = facade.get_amenities_page(*page)
+            return with_validators(
+                page_response([amenity.to_dict() for amenity in amenities], next_key), *validators)
+
         amenity_list = facade.get_all_amenities()
 
         # If there are amenities, return them as JSON
         if amenity_list:
-            return jsonify(amenity_list)
+            return with_validators(jsonify(amenity_list), *validators)
 
         # Base case if no amenities were found
         return {"message": "No amenities found"}, 404
 
 
+@api.route('/batch')
+class AmenityBatch(Resource):
+    @api.expect([amenity_model])
+    @api.response(201, 'All amenities successfully created')
+    @api.response(207, 'Some amenities created, see the errors of the others')
+    @api.response(400, 'Invalid batch or no amenity created')
+    def post(self):
+        """Register several amenities at once"""
+        try:
+            amenities_data = parse_batch()
+            results = facade.create_amenities_many(amenities_data)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return batch_response(results)
+
+
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(304, "Not modified since the client's copy")
     @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
         """Get amenity details by ID"""
@@ -55,7 +99,11 @@ class AmenityResource(Resource):
         if not amenity:
             return {"error": "Amenity not found"}, 404
 
-        return amenity.to_dict(), 200
+        validators = entity_validators(amenity)
+        if is_not_modified(*validators):
+            return not_modified(*validators)
+
+        return with_validators((amenity.to_dict(), 200), *validators)
 
     @api.expect(amenity_model, validate=True)
     @api.response(200, 'Amenity updated successfully')
@@ -70,3 +118,25 @@ class AmenityResource(Resource):
             return {"error": str(e)}, 400
 
         return updated_amenity.to_dict(), 200
+
+
+@api.route('/<amenity_id>/places')
+class AmenityPlaceList(Resource):
+    @api.response(200, 'Places having the amenity retrieved successfully')
+    @api.response(400, 'Invalid fields or expand parameters')
+    @api.response(404, 'Amenity not found')
+    @api.param('fields', 'Comma-separated fields to return')
+    @api.param('expand', 'Comma-separated embedded objects to return in full (owner, amenities, reviews), the others are given as ids')
+    def get(self, amenity_id):
+        """Retrieve the places having an amenity"""
+        try:
+            fields, expand = parse_fields_args(Place)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        try:
+            places = facade.get_places_by_amenity(amenity_id)
+        except ValueError as e:
+            return {"error": str(e)}, 404
+
+        return [place.to_dict(fields, expand) for place in places], 200
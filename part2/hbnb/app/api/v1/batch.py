@@ -0,0 +1,39 @@
+'''
+This module implements the request and response format shared by the batch endpoints.
+'''
+from flask import request
+
+MAX_BATCH_SIZE = 1000
+
+
+def parse_batch():
+    """Return the list of items posted to a batch endpoint"""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        raise ValueError("Body must be a JSON array of items")
+    if not items:
+        raise ValueError("Batch must hold at least one item")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch must hold at most {MAX_BATCH_SIZE} items")
+    return items
+
+
+def batch_response(results):
+    """Build the body and status of a batch response, with one result per
+    item in the posted order: the created object or the item's error"""
+    items = []
+    created = 0
+    for result in results:
+        if isinstance(result, Exception):
+            items.append({"error": str(result)})
+        else:
+            items.append(result.to_dict())
+            created += 1
+
+    if created == len(results):
+        status = 201
+    elif created:
+        status = 207
+    else:
+        status = 400
+    return {"created": created, "results": items}, status
@@ -0,0 +1,82 @@
+'''
+This module implements the validators (ETag, Last-Modified) and conditional
+GET handling shared by the endpoints.
+'''
+import hashlib
+from datetime import timezone
+from flask import Response, request
+from werkzeug.http import http_date
+
+
+def entity_validators(obj):
+    """Return the (ETag, Last-Modified) of one object's representation.
+    Revisions restart when a durable backend reloads an object, the
+    modification time tells those apart. The query string picks the
+    representation, so it is part of the ETag."""
+    last_modified = obj.last_modified()
+    etag = _etag(obj.id, obj.revision, last_modified.isoformat(), request.query_string)
+    return etag, last_modified
+
+
+def collection_validators(version, last_modified):
+    """Return the (ETag, Last-Modified) of a collection response, the query
+    string is part of the ETag as pages and formats differ. Versions
+    restart with the process for in-memory data, the modification time
+    tells those apart."""
+    return _etag(request.full_path, version, last_modified.isoformat()), last_modified
+
+
+def list_validators(objs):
+    """Return the (ETag, Last-Modified) of a list of objects picked out of a
+    collection, which only changes when one of them does"""
+    last_modified = max((obj.last_modified() for obj in objs), default=None)
+    etag = _etag(request.full_path, tuple((obj.id, obj.revision) for obj in objs),
+                 last_modified and last_modified.isoformat())
+    return etag, last_modified
+
+
+def is_not_modified(etag, last_modified):
+    """Whether the client's cached copy is still current. If-None-Match
+    takes precedence over If-Modified-Since."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+
+    if request.if_modified_since and last_modified:
+        # HTTP dates have a one second precision
+        modified = _as_utc(last_modified).replace(microsecond=0)
+        return modified <= request.if_modified_since
+
+    return False
+
+
+def not_modified(etag, last_modified):
+    response = Response(status=304)
+    return with_validators(response, etag, last_modified)
+
+
+def with_validators(result, etag, last_modified):
+    """Attach the validators to a successful response, either a Response
+    or a (body, status) or (body, status, headers) tuple as returned by
+    the resources"""
+    headers = {"ETag": f'"{etag}"'}
+    if last_modified:
+        headers["Last-Modified"] = http_date(_as_utc(last_modified))
+
+    if isinstance(result, Response):
+        if result.status_code < 400:
+            result.headers.update(headers)
+        return result
+
+    body, status = result[0], result[1]
+    if 200 <= status < 300:
+        return body, status, {**(result[2] if len(result) > 2 else {}), **headers}
+    return result
+
+
+def _etag(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _as_utc(moment):
+    # Naive datetimes from the models are in local time
+    return moment.astimezone(timezone.utc)
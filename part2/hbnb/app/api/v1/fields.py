@@ -0,0 +1,28 @@
+'''
+This module implements the sparse fieldsets (?fields=) and embedding
+control (?expand=) shared by the endpoints returning users, places and reviews.
+'''
+from flask import request
+
+
+def parse_fields_args(model):
+    """Return (fields, expand) from the query string for objects of the
+    model class, each None when the client did not give it"""
+    return (
+        _names_arg("fields", model.FIELDS),
+        _names_arg("expand", model.EXPANDABLE),
+    )
+
+
+def _names_arg(name, allowed):
+    value = request.args.get(name)
+    if value is None:
+        return None
+
+    names = frozenset(part.strip() for part in value.split(",") if part.strip())
+    unknown = names.difference(allowed)
+    if unknown:
+        raise ValueError(
+            f"Unknown {name}: {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(allowed) or 'none'}")
+    return names
@@ -0,0 +1,70 @@
+'''
+This module implements the cursor-based pagination shared by the list endpoints.
+'''
+import base64
+from urllib.parse import urlencode
+from flask import request
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(key):
+    """Turn a repository position into an opaque cursor"""
+    return base64.urlsafe_b64encode(str(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Turn an opaque cursor back into a repository position"""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        key = int(base64.urlsafe_b64decode(cursor + padding).decode())
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    # Positions are never negative, such a cursor was not made by us
+    if key < 0:
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def parse_page_args():
+    """Return (limit, after) from the query string,
+    or None when the client did not ask for pagination"""
+    if "limit" not in request.args and "cursor" not in request.args:
+        return None
+
+    cursor = request.args.get("cursor")
+    after = decode_cursor(cursor) if cursor else None
+
+    return parse_limit(), after
+
+
+def parse_limit():
+    """Return the page size from the query string, DEFAULT_LIMIT when absent"""
+    try:
+        limit = int(request.args.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not (1 <= limit <= MAX_LIMIT):
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+def next_url(next_key):
+    """URL of the page starting at next_key, same query otherwise"""
+    if next_key is None:
+        return None
+
+    args = request.args.copy()
+    args["cursor"] = encode_cursor(next_key)
+    args["limit"] = args.get("limit", DEFAULT_LIMIT)
+    return request.base_url + "?" + urlencode(list(args.items(multi=True)))
+
+
+def page_response(items, next_key):
+    """Build a paginated response: the body stays a plain list, as without
+    pagination, and a Link header gives the next page if there is one"""
+    headers = {}
+    if next_key is not None:
+        headers["Link"] = f'<{next_url(next_key)}>; rel="next"'
+    return items, 200, headers
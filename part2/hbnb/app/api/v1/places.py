@@ -1,8 +1,16 @@
+import math
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import facade
+from app.api.v1.pagination import (
+    parse_page_args, parse_limit, page_response, decode_cursor)
+from app.api.v1.streaming import parse_stream_arg, stream_response
+from app.api.v1.batch import parse_batch, batch_response
+from app.api.v1.fields import parse_fields_args
+from app.api.v1.conditional import (
+    entity_validators, collection_validators, is_not_modified, not_modified, with_validators)
 from app.models.amenity import Amenity
 from app.models.place import Place
-from flask import jsonify
+from flask import jsonify, request
 
 api = Namespace('places', description='Place operations')
 
@@ -49,30 +57,196 @@ class PlaceList(Resource):
         return new_place.to_dict(), 201
 
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(304, "Not modified since the client's copy")
+    @api.response(400, 'Invalid pagination or streaming parameters')
     @api.response(404, 'No place found')
+    @api.param('limit', 'Maximum number of places per page')
+    @api.param('cursor', "Opaque cursor taken from the previous page's Link header")
+    @api.param('stream', 'Stream the whole collection, as ndjson or as a json array')
+    @api.param('fields', 'Comma-separated fields to return')
+    @api.param('expand', 'Comma-separated embedded objects to return in full (owner, amenities, reviews), the others are given as ids')
     def get(self):
         """Retrieve a list of all places"""
 
-        place_list = facade.get_all_places()
+        try:
+            page = parse_page_args()
+            stream_format = parse_stream_arg()
+            fields, expand = parse_fields_args(Place)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        # Conditional GET, answered before serializing anything
+        validators = collection_validators(*facade.get_collection_version('places'))
+        if is_not_modified(*validators):
+            return not_modified(*validators)
+
+        # Streaming mode, the whole collection without holding it in memory
+        if stream_format:
+            return with_validators(
+                stream_response(facade.iter_places(), stream_format, fields, expand), *validators)
+
+        # Paginated mode, only when the client asks for it
+        if page:
+            places, next_key = facade.get_places_page(*page)
+            return with_validators(
+                page_response([place.to_dict(fields, expand) for place in places], next_key),
+                *validators)
+
+        place_list = facade.get_all_places(fields, expand)
 
         if place_list:
-            return jsonify(place_list)
+            return with_validators(jsonify(place_list), *validators)
 
             # Base case if no places were found
         return {"error": "No place found"}, 404
 
 
+@api.route('/batch')
+class PlaceBatch(Resource):
+    @api.expect([place_model])
+    @api.response(201, 'All places successfully created')
+    @api.response(207, 'Some places created, see the errors of the others')
+    @api.response(400, 'Invalid batch or no place created')
+    def post(self):
+        """Register several places at once"""
+        try:
+            places_data = parse_batch()
+            results = facade.create_places_many(places_data)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return batch_response(results)
+
+
+def float_arg(name, default=None, required=True):
+    """Read a finite float from the query string"""
+    value = request.args.get(name)
+    if value is None:
+        if default is None and required:
+            raise ValueError(f"{name} is required")
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    # float() takes "nan" and "inf", which no filter or coordinate can use
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.response(200, 'Matching places retrieved successfully, a Link header gives the next page')
+    @api.response(400, 'Invalid search parameters')
+    @api.param('q', 'Words to look for in titles, descriptions and review texts')
+    @api.param('min_price', 'Minimum price per night')
+    @api.param('max_price', 'Maximum price per night')
+    @api.param('amenities', 'Comma-separated names of amenities the place must have')
+    @api.param('min_rating', 'Minimum average rating (1-5)')
+    @api.param('sort', "'relevance' (best match first, default with q), "
+                       "'price' (cheapest first, default otherwise) or 'rating' (best rated first)")
+    @api.param('limit', 'Maximum number of places returned')
+    @api.param('cursor', "Opaque cursor taken from the previous page's Link header")
+    @api.param('fields', 'Comma-separated fields to return')
+    @api.param('expand', 'Comma-separated embedded objects to return in full (owner, amenities, reviews), the others are given as ids')
+    def get(self):
+        """Search places by text, price, amenities and rating"""
+        try:
+            fields, expand = parse_fields_args(Place)
+            limit = parse_limit()
+            cursor = request.args.get('cursor')
+            offset = decode_cursor(cursor) if cursor else 0
+
+            amenities = request.args.get('amenities')
+            places = facade.search_places(
+                min_price=float_arg('min_price', required=False),
+                max_price=float_arg('max_price', required=False),
+                amenity_names=[name.strip() for name in amenities.split(',') if name.strip()]
+                if amenities else None,
+                min_rating=float_arg('min_rating', required=False),
+                sort=request.args.get('sort'),
+                query=request.args.get('q', '').strip() or None,
+                # One more than asked, to know whether there is a next page
+                limit=limit + 1,
+                offset=offset,
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return page_response([place.to_dict(fields, expand) for place in places[:limit]],
+                             offset + limit if len(places) > limit else None)
+
+
+@api.route('/within')
+class PlaceArea(Resource):
+    @api.response(200, 'Places inside the bounding box retrieved successfully')
+    @api.response(400, 'Invalid bounding box')
+    @api.param('min_lat', 'Southern latitude of the box')
+    @api.param('min_lon', 'Western longitude of the box, greater than max_lon to cross the antimeridian')
+    @api.param('max_lat', 'Northern latitude of the box')
+    @api.param('max_lon', 'Eastern longitude of the box')
+    @api.param('fields', 'Comma-separated fields to return')
+    @api.param('expand', 'Comma-separated embedded objects to return in full (owner, amenities, reviews), the others are given as ids')
+    def get(self):
+        """Retrieve the places inside a bounding box"""
+        try:
+            fields, expand = parse_fields_args(Place)
+            places = facade.get_places_in_area(
+                float_arg('min_lat'), float_arg('min_lon'),
+                float_arg('max_lat'), float_arg('max_lon'))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return [place.to_dict(fields, expand) for place in places], 200
+
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.response(200, 'Places around the point retrieved successfully')
+    @api.response(400, 'Invalid point or radius')
+    @api.param('lat', 'Latitude of the point')
+    @api.param('lon', 'Longitude of the point')
+    @api.param('radius_km', 'Search radius in kilometers (default 10)')
+    @api.param('fields', 'Comma-separated fields to return')
+    @api.param('expand', 'Comma-separated embedded objects to return in full (owner, amenities, reviews), the others are given as ids')
+    def get(self):
+        """Retrieve the places around a point, closest first"""
+        try:
+            fields, expand = parse_fields_args(Place)
+            results = facade.get_places_near(
+                float_arg('lat'), float_arg('lon'), float_arg('radius_km', 10.0))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return [dict(place.to_dict(fields, expand), distance_km=round(distance, 3))
+                for place, distance in results], 200
+
+
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(304, "Not modified since the client's copy")
+    @api.response(400, 'Invalid fields or expand parameters')
     @api.response(404, 'Place not found')
+    @api.param('fields', 'Comma-separated fields to return')
+    @api.param('expand', 'Comma-separated embedded objects to return in full (owner, amenities, reviews), the others are given as ids')
     def get(self, place_id):
         """Get place details by ID"""
+        try:
+            fields, expand = parse_fields_args(Place)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
         place = facade.get_place(place_id)
         if not place:
             return {"error": "Place not found"}, 404
 
-        return place.to_dict(), 200
+        validators = entity_validators(place)
+        if is_not_modified(*validators):
+            return not_modified(*validators)
+
+        return with_validators((place.to_dict(fields, expand), 200), *validators)
 
     @api.expect(place_model, validate=False)
     @api.response(200, 'Place updated successfully')
@@ -105,6 +279,19 @@ class PlaceAmenity(Resource):
 
         return facade.place_repo.get(place_id).to_dict(), 200
 
+@api.route('/<place_id>/amenities/<amenity_id>')
+class PlaceAmenityResource(Resource):
+    @api.response(200, 'Amenity successfully removed from place')
+    @api.response(404, 'Not found')
+    def delete(self, place_id, amenity_id):
+        """Remove an amenity from a place"""
+        try:
+            place = facade.remove_amenity_from_place(place_id, amenity_id)
+        except ValueError as e:
+            return {"error": str(e)}, 404
+
+        return place.to_dict(), 200
+
 @api.route('/<place_id>/reviews')
 class PlaceReviewList(Resource):
     @api.expect(amenity_model, validate=True)
@@ -1,5 +1,13 @@
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import facade
+from app.api.v1.pagination import parse_page_args, page_response
+from app.api.v1.streaming import parse_stream_arg, stream_response
+from app.api.v1.batch import parse_batch, batch_response
+from app.api.v1.fields import parse_fields_args
+from app.models.review import Review
+from app.api.v1.conditional import (
+    entity_validators, collection_validators, list_validators, is_not_modified, not_modified,
+    with_validators)
 
 api = Namespace('reviews', description='Review operations')
 
@@ -29,31 +37,89 @@ class ReviewList(Resource):
         return new_review.to_dict(), 201
 
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(304, "Not modified since the client's copy")
+    @api.response(400, 'Invalid pagination or streaming parameters')
+    @api.param('limit', 'Maximum number of reviews per page')
+    @api.param('cursor', "Opaque cursor taken from the previous page's Link header")
+    @api.param('stream', 'Stream the whole collection, as ndjson or as a json array')
+    @api.param('fields', 'Comma-separated fields to return')
+    @api.param('expand', 'Give user to embed the author in full, otherwise only its id is given')
     def get(self):
         """Retrieve a list of all reviews"""
 
+        try:
+            page = parse_page_args()
+            stream_format = parse_stream_arg()
+            fields, expand = parse_fields_args(Review)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        # Conditional GET, answered before serializing anything
+        validators = collection_validators(*facade.get_collection_version('reviews'))
+        if is_not_modified(*validators):
+            return not_modified(*validators)
+
+        # Streaming mode, the whole collection without holding it in memory
+        if stream_format:
+            return with_validators(
+                stream_response(facade.iter_reviews(), stream_format, fields, expand), *validators)
+
+        # Paginated mode, only when the client asks for it
+        if page:
+            reviews, next_key = facade.get_reviews_page(*page)
+            return with_validators(
+                page_response([review.to_dict(fields, expand) for review in reviews], next_key),
+                *validators)
+
         review_list = facade.get_all_reviews()
 
         if review_list:
-            return [review.to_dict() for review in review_list], 200
+            return with_validators(
+                ([review.to_dict(fields, expand) for review in review_list], 200), *validators)
 
         return {"error": "No review found"}, 404
 
 
+@api.route('/batch')
+class ReviewBatch(Resource):
+    @api.expect([review_model])
+    @api.response(201, 'All reviews successfully created')
+    @api.response(207, 'Some reviews created, see the errors of the others')
+    @api.response(400, 'Invalid batch or no review created')
+    def post(self):
+        """Register several reviews at once"""
+        try:
+            reviews_data = parse_batch()
+            results = facade.create_reviews_many(reviews_data)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return batch_response(results)
+
+
 @api.route('/<review_id>')
 class ReviewResource(Resource):
     @api.response(200, 'Review details retrieved successfully')
+    @api.response(304, "Not modified since the client's copy")
+    @api.response(400, 'Invalid fields or expand parameters')
     @api.response(404, 'Review not found')
+    @api.param('fields', 'Comma-separated fields to return')
+    @api.param('expand', 'Give user to embed the author in full, otherwise only its id is given')
     def get(self, review_id):
         """Get review details by ID"""
         try:
+            fields, expand = parse_fields_args(Review)
             review = facade.get_review(review_id)
             if not review:
                 return {"error": "Review not found"}, 404
         except ValueError as e:
             return {"error": str(e)}, 400
 
-        return review.to_dict(), 200
+        validators = entity_validators(review)
+        if is_not_modified(*validators):
+            return not_modified(*validators)
+
+        return with_validators((review.to_dict(fields, expand), 200), *validators)
 
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
@@ -91,12 +157,28 @@ class ReviewResource(Resource):
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(304, "Not modified since the client's copy")
+    @api.response(400, 'Invalid fields or expand parameters')
     @api.response(404, 'Place not found')
+    @api.param('fields', 'Comma-separated fields to return')
+    @api.param('expand', 'Give user to embed the author in full, otherwise only its id is given')
     def get(self, place_id):
         """Get all reviews for a specific place"""
         try:
-            reviews = facade.get_reviews_by_place(place_id)
-            return [review.to_dict() for review in reviews], 200
+            fields, expand = parse_fields_args(Review)
+        except ValueError as e:
+            return {"error": str(e)}, 400
 
+        try:
+            reviews = facade.get_reviews_by_place(place_id)
         except ValueError as e:
             return {"error": str(e)}, 404
+
+        # Conditional GET on the reviews of this place only,
+        # answered before serializing anything
+        validators = list_validators(reviews)
+        if is_not_modified(*validators):
+            return not_modified(*validators)
+
+        return with_validators(
+            ([review.to_dict(fields, expand) for review in reviews], 200), *validators)
@@ -0,0 +1,76 @@
+'''
+This module implements the streaming mode of the list endpoints, used to
+export whole collections without building them in memory.
+'''
+import json
+from flask import Response, request
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+CHUNK_SIZE = 100
+
+
+def parse_stream_arg():
+    """Return the requested stream format, or None when not streaming"""
+    stream_format = request.args.get("stream")
+    if stream_format is None:
+        return None
+
+    if stream_format not in STREAM_FORMATS:
+        raise ValueError(f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+    return stream_format
+
+
+def stream_response(objects, stream_format, fields=None, expand=None):
+    """Stream objects serialized with to_json(), or in the representation
+    picked by fields and expand, either as newline-delimited JSON or as a
+    chunked JSON array. The exported objects are serialized without
+    filling the serialization cache, so memory stays flat."""
+    lines = _encoded(objects, fields, expand)
+    if stream_format == "ndjson":
+        body = _ndjson_chunks(lines)
+    else:
+        body = _json_array_chunks(lines)
+
+    return Response(body, mimetype=STREAM_FORMATS[stream_format])
+
+
+def _encoded(objects, fields, expand):
+    if fields is None and expand is None:
+        for obj in objects:
+            yield obj.to_json(cached=False)
+    else:
+        for obj in objects:
+            yield json.dumps(obj.to_dict(fields, expand)).encode()
+
+
+def _chunked(lines):
+    """Group small byte strings so the server doesn't write them one by one"""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == CHUNK_SIZE:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+
+def _ndjson_chunks(lines):
+    return _chunked(line + b"\n" for line in lines)
+
+
+def _json_array_chunks(lines):
+    yield b"["
+    yield from _chunked(_with_separators(lines))
+    yield b"]"
+
+
+def _with_separators(lines):
+    first = True
+    for line in lines:
+        yield line if first else b"," + line
+        first = False
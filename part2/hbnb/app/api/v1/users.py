@@ -1,5 +1,12 @@
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import facade
+from app.api.v1.pagination import parse_page_args, page_response
+from app.api.v1.streaming import parse_stream_arg, stream_response
+from app.api.v1.batch import parse_batch, batch_response
+from app.api.v1.fields import parse_fields_args
+from app.models.user import User
+from app.api.v1.conditional import (
+    entity_validators, collection_validators, is_not_modified, not_modified, with_validators)
 from flask import jsonify
 
 api = Namespace("users", description="User operations")
@@ -38,28 +45,86 @@ class UserList(Resource):
         return new_user.to_dict(), 201 
 
     @api.response(200, "User details retrieved successfully")
+    @api.response(304, "Not modified since the client's copy")
+    @api.response(400, "Invalid pagination or streaming parameters")
     @api.response(404, "User not found")
+    @api.param("limit", "Maximum number of users per page")
+    @api.param("cursor", "Opaque cursor taken from the previous page's Link header")
+    @api.param("stream", "Stream the whole collection, as ndjson or as a json array")
+    @api.param("fields", "Comma-separated fields to return")
     def get(self):
         """Retrieve a list of all users"""
 
-        user_list = facade.get_all_users()
+        try:
+            page = parse_page_args()
+            stream_format = parse_stream_arg()
+            fields, expand = parse_fields_args(User)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        # Conditional GET, answered before serializing anything
+        validators = collection_validators(*facade.get_collection_version('users'))
+        if is_not_modified(*validators):
+            return not_modified(*validators)
+
+        # Streaming mode, the whole collection without holding it in memory
+        if stream_format:
+            return with_validators(
+                stream_response(facade.iter_users(), stream_format, fields, expand), *validators)
+
+        # Paginated mode, only when the client asks for it
+        if page:
+            users, next_key = facade.get_users_page(*page)
+            return with_validators(
+                page_response([user.to_dict(fields, expand) for user in users], next_key),
+                *validators)
+
+        user_list = facade.get_all_users(fields, expand)
 
         # If there are users, return them as JSON
         if user_list:
-            return jsonify(user_list)
+            return with_validators(jsonify(user_list), *validators)
 
         # Base case if no users were found
         return {"error": "No users found"}, 404
 
+
+@api.route("/batch")
+class UserBatch(Resource):
+    @api.expect([user_model])
+    @api.response(201, "All users successfully created")
+    @api.response(207, "Some users created, see the errors of the others")
+    @api.response(400, "Invalid batch or no user created")
+    def post(self):
+        """Register several users at once"""
+        try:
+            users_data = parse_batch()
+            results = facade.create_users_many(users_data)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return batch_response(results)
+
 @api.route("/<user_id>")
 class UserResource(Resource):
     @api.response(200, "User details retrieved successfully")
+    @api.response(304, "Not modified since the client's copy")
+    @api.response(400, "Invalid fields")
     @api.response(404, "User not found")    
+    @api.param("fields", "Comma-separated fields to return")
     def get(self, user_id):
         """Get user details by ID"""
+        try:
+            fields, expand = parse_fields_args(User)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
         user = facade.get_user(user_id)
         if user:
-            return user.to_dict(), 200
+            validators = entity_validators(user)
+            if is_not_modified(*validators):
+                return not_modified(*validators)
+            return with_validators((user.to_dict(fields, expand), 200), *validators)
         
         return {"error": "User not found"}, 404
 
@@ -1,29 +1,34 @@
 '''
 This module defines the Business Logic Amenity class.
 '''
+import sys
 from app.models.base_model import BaseModel
+from app.models.validators import check_type, check_length
 
 class Amenity(BaseModel):
+    __slots__ = ("_name",)
+
+    FIELDS = ("id", "name")
+
     def __init__(self, name):
         super().__init__()
         self.name = name 
 
+    @classmethod
+    def restore(cls, obj_id, created_at, updated_at, name):
+        """Rebuild an amenity from trusted stored data, without validating it"""
+        amenity = cls._restored(obj_id, created_at, updated_at)
+        amenity._name = sys.intern(name)
+        return amenity
+
     @property
     def name(self):
         return self._name
 
     @name.setter
     def name(self, value):
-        if not isinstance(value, str):
-            raise TypeError("Name must be a string.")
-        if len(value) > 50:
-            raise ValueError("Name must be 50 characters maximum.")
-        elif len(value) < 1:
-            raise ValueError("Name must have at least 1 character.")
-        self._name = value
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-        }
+        check_type(value, str, "Name must be a string.")
+        check_length(value, "Name must be 50 characters maximum.", maximum=50)
+        check_length(value, "Name must have at least 1 character.", minimum=1)
+        self._name = sys.intern(value)
+        self._changed()
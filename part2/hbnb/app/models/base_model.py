@@ -1,19 +1,190 @@
+import json
+import threading
 import uuid
-from datetime import datetime
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# Timestamps are stored as microseconds since this date, an int takes
+# less memory than a datetime and converts back exactly
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_micros(value):
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(value):
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class SerializationCache:
+    """The default representations of the max_size most recently
+    serialized objects, so serializing a whole collection doesn't keep a
+    copy of it alive. An entry only serves the object it was built from,
+    in the state it was built from."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        # obj.id -> (weak reference to obj, cache key, dict), least recent first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, obj, key):
+        with self._lock:
+            entry = self._entries.get(obj.id)
+            if entry is not None and entry[0]() is obj and entry[1] == key:
+                self._entries.move_to_end(obj.id)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+
+    def put(self, obj, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[obj.id] = (weakref.ref(obj), key, value)
+            self._entries.move_to_end(obj.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def resize(self, max_size):
+        """Change the number of entries kept, 0 disables the cache"""
+        with self._lock:
+            self.max_size = max_size
+            while len(self._entries) > max(max_size, 0):
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size,
+                    "hits": self.hits, "misses": self.misses}
+
+
+serialization_cache = SerializationCache(10000)
+
 
 class BaseModel:
+    # Slots instead of a __dict__ per object, subclasses declare their own.
+    # __weakref__ lets repositories hold objects in weak identity maps.
+    __slots__ = (
+        "id",
+        "_created_at",
+        "_updated_at",
+        "_version",
+        "__weakref__",
+    )
+
+    # Fields of the serialized object, in order
+    FIELDS = ()
+    # Fields holding other objects, embedded only on request when the
+    # client picks the representation
+    EXPANDABLE = ()
+
     def __init__(self):
+        # Bumped on every change, cached serializations are keyed on it
+        self._version = 0
+
         self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self._created_at = self._updated_at = _to_micros(datetime.now())
+
+    @classmethod
+    def _restored(cls, obj_id, created_at, updated_at):
+        """An object with the given id and timestamps (in microseconds),
+        for the restore() methods of the models to set the rest"""
+        obj = cls.__new__(cls)
+        obj._version = 0
+        obj.id = obj_id
+        obj._created_at = created_at
+        obj._updated_at = updated_at
+        return obj
+
+    @property
+    def created_at(self):
+        return _from_micros(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = _to_micros(value)
+
+    @property
+    def updated_at(self):
+        return _from_micros(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = _to_micros(value)
 
     def save(self):
         """Update the updated_at timestamp whenever the object is modified"""
-        self.updated_at = datetime.now()
+        self._updated_at = _to_micros(datetime.now())
+        self._changed()
 
     def update(self, data):
         """Update the attributes of the object based on the provided dictionary"""
         for key, value in data.items():
-            if hasattr(self, key):
+            # Only validated properties can be set, never id, timestamps
+            # or read-only properties
+            attribute = getattr(type(self), key, None)
+            if (isinstance(attribute, property) and attribute.fset is not None
+                    and key not in ("created_at", "updated_at")):
                 setattr(self, key, value)
         self.save()  # Update the updated_at timestamp
+
+    def to_dict(self, fields=None, expand=None, cached=True):
+        """Return the serialized object. The default representation is
+        kept in serialization_cache and rebuilt only when the object or
+        an object it embeds changed, the dict is shared, copy it before
+        modifying it. With cached=False it is built without going through
+        the cache, for objects serialized once like in exports.
+
+        fields limits the output to the given FIELDS. When expand is given,
+        the EXPANDABLE fields it names are embedded in full and the other
+        ones hold ids. Such partial representations are not cached."""
+        if fields is not None or expand is not None:
+            return {name: self._field(name, expand)
+                    for name in self.FIELDS if fields is None or name in fields}
+        if not cached:
+            return self._build_dict()
+
+        key = self._cache_key()
+        serialized = serialization_cache.get(self, key)
+        if serialized is None:
+            serialized = self._build_dict()
+            serialization_cache.put(self, key, serialized)
+        return serialized
+
+    def to_json(self, cached=True):
+        """Return to_dict() encoded as JSON bytes"""
+        return json.dumps(self.to_dict(cached=cached)).encode()
+
+    @property
+    def revision(self):
+        """Changes whenever the serialized object changes"""
+        return self._cache_key()
+
+    def last_modified(self):
+        """Last time the serialized object changed, models embedding
+        other objects take theirs into account"""
+        return self.updated_at
+
+    def _build_dict(self):
+        return {name: self._field(name, None) for name in self.FIELDS}
+
+    def _field(self, name, expand):
+        """Serialize one field, expand being None for the default
+        representation"""
+        return getattr(self, name)
+
+    def _changed(self):
+        """Invalidate the cached serializations"""
+        self._version += 1
+
+    def _cache_key(self):
+        """Versions the cached serializations depend on, models embedding
+        other objects add theirs"""
+        return self._version
@@ -1,10 +1,32 @@
-from app.models.base_model import BaseModel
+from app.models.base_model import BaseModel, _from_micros
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.review import Review
+from app.models.validators import check_type, check_length, check_range
 
 
 class Place(BaseModel):
+    __slots__ = (
+        "_title",
+        "_description",
+        "_price",
+        "_latitude",
+        "_longitude",
+        "_owner",
+        "__amenities",
+        "__reviews",
+        "__rating_count",
+        "__rating_sum",
+        "__rating_histogram",
+    )
+
+    FIELDS = (
+        "id", "title", "description", "price", "latitude", "longitude",
+        "owner", "amenities", "reviews",
+        "review_count", "average_rating", "rating_histogram",
+    )
+    EXPANDABLE = ("owner", "amenities", "reviews")
+
     def __init__(
         self,
         title,
@@ -23,8 +45,37 @@ class Place(BaseModel):
         self.latitude = latitude
         self.longitude = longitude
         self.owner = owner
-        self.__amenities = []
-        self.__reviews = []
+        # amenity id -> amenity, keeps insertion order and O(1) membership
+        # review id -> review, keeps insertion order and O(1) removal
+        # Both are replaced by a changed copy, never changed in place, so
+        # threads serializing the place iterate a stable snapshot while a
+        # writer adds or removes entries
+        self.__amenities = {}
+        self.__reviews = {}
+
+        # Running rating aggregates, kept up to date by the review methods
+        self.__rating_count = 0
+        self.__rating_sum = 0
+        self.__rating_histogram = [0] * 5
+
+    @classmethod
+    def restore(cls, obj_id, created_at, updated_at, title, description, price,
+                latitude, longitude, owner, amenities):
+        """Rebuild a place from trusted stored data, without validating it.
+        Reviews are added afterwards with add_review()."""
+        place = cls._restored(obj_id, created_at, updated_at)
+        place._title = title
+        place._description = description
+        place._price = price
+        place._latitude = latitude
+        place._longitude = longitude
+        place._owner = owner
+        place.__amenities = {amenity.id: amenity for amenity in amenities}
+        place.__reviews = {}
+        place.__rating_count = 0
+        place.__rating_sum = 0
+        place.__rating_histogram = [0] * 5
+        return place
 
     @property
     def title(self):
@@ -32,11 +83,10 @@ class Place(BaseModel):
 
     @title.setter
     def title(self, value):
-        if not isinstance(value, str):
-            raise TypeError("Title must be a string.")
-        if not (1 <= len(value) <= 100):
-            raise ValueError("Title must be between 1 and 100 characters.")
+        check_type(value, str, "Title must be a string.")
+        check_length(value, "Title must be between 1 and 100 characters.", 1, 100)
         self._title = value
+        self._changed()
 
     @property
     def description(self):
@@ -44,11 +94,10 @@ class Place(BaseModel):
 
     @description.setter
     def description(self, value):
-        if not isinstance(value, str):
-            raise TypeError("Description must be a string.")
-        if len(value) > 1000:
-            raise ValueError("Description must be 1000 characters maximum.")
+        check_type(value, str, "Description must be a string.")
+        check_length(value, "Description must be 1000 characters maximum.", maximum=1000)
         self._description = value
+        self._changed()
 
     @property
     def price(self):
@@ -56,11 +105,10 @@ class Place(BaseModel):
 
     @price.setter
     def price(self, value):
-        if not isinstance(value, (int, float)):
-            raise TypeError("Price must be a number.")
-        if value < 0:
-            raise ValueError("Price cannot be negative.")
+        check_type(value, (int, float), "Price must be a number.")
+        check_range(value, "Price cannot be negative.", minimum=0)
         self._price = value
+        self._changed()
 
     @property
     def latitude(self):
@@ -68,11 +116,10 @@ class Place(BaseModel):
 
     @latitude.setter
     def latitude(self, value):
-        if not isinstance(value, (int, float)):
-            raise TypeError("Latitude must be a number.")
-        if not (-90 <= value <= 90):
-            raise ValueError("Latitude must be between -90 and 90.")
+        check_type(value, (int, float), "Latitude must be a number.")
+        check_range(value, "Latitude must be between -90 and 90.", -90, 90)
         self._latitude = value
+        self._changed()
 
     @property
     def longitude(self):
@@ -80,11 +127,10 @@ class Place(BaseModel):
 
     @longitude.setter
     def longitude(self, value):
-        if not isinstance(value, (int, float)):
-            raise TypeError("Longitude must be a number.")
-        if not (-180 <= value <= 180):
-            raise ValueError("Longitude must be between -180 and 180.")
+        check_type(value, (int, float), "Longitude must be a number.")
+        check_range(value, "Longitude must be between -180 and 180.", -180, 180)
         self._longitude = value
+        self._changed()
 
     @property
     def owner(self):
@@ -92,35 +138,117 @@ class Place(BaseModel):
 
     @owner.setter
     def owner(self, value):
-        if not isinstance(value, User):
-            raise TypeError("Owner must be an instance of the User class.")
+        check_type(value, User, "Owner must be an instance of the User class.")
         self._owner = value
+        self._changed()
+
+    @property
+    def amenities(self):
+        return list(self.__amenities.values())
+
+    @property
+    def reviews(self):
+        return list(self.__reviews.values())
 
     def add_review(self, review):
         """Add review to place."""
         if not isinstance(review, Review):
             raise ValueError("review must be an instance of the Review class.")
-        self.__reviews.append(review)
+        if review.id in self.__reviews:
+            return
+        self.__reviews = {**self.__reviews, review.id: review}
+        self._add_rating(review.rating, 1)
+
+    def remove_review(self, review):
+        """Remove review from place."""
+        if review.id in self.__reviews:
+            reviews = dict(self.__reviews)
+            del reviews[review.id]
+            self.__reviews = reviews
+            self._add_rating(review.rating, -1)
+
+    def update_review_rating(self, old_rating, new_rating):
+        """Account for a review of this place whose rating changed."""
+        self._add_rating(old_rating, -1)
+        self._add_rating(new_rating, 1)
+
+    def _add_rating(self, rating, count):
+        self.__rating_count += count
+        self.__rating_sum += rating * count
+        self.__rating_histogram[rating - 1] += count
+        self._changed()
+
+    @property
+    def review_count(self):
+        return self.__rating_count
+
+    @property
+    def average_rating(self):
+        """Average rating of the place, 0 when it has no review"""
+        if not self.__rating_count:
+            return 0
+        return self.__rating_sum / self.__rating_count
+
+    @property
+    def rating_histogram(self):
+        """Number of reviews for each rating, from 1 to 5 stars"""
+        return {str(stars): count for stars, count in enumerate(self.__rating_histogram, 1)}
 
     def add_amenity(self, amenity):
         """Add amenity to place."""
         if not isinstance(amenity, Amenity):
             raise ValueError("amenity must be an instance of the Amenity class.")
 
-        if amenity in self.__amenities:
+        if amenity.id in self.__amenities:
             raise ValueError("amenity already registered for that place")
-        self.__amenities.append(amenity)
-
-    def to_dict(self):
-        """return all info of place with amenities and review dedicated"""
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "price": self.price,
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "owner": self.owner.to_dict() if isinstance(self.owner, User) else None,
-            "amenities": [amenity.name for amenity in self.__amenities],
-            "reviews": [review.text for review in self.__reviews],
-        }
+        self.__amenities = {**self.__amenities, amenity.id: amenity}
+        self._changed()
+
+    def remove_amenity(self, amenity):
+        """Remove amenity from place."""
+        if amenity.id not in self.__amenities:
+            raise ValueError("amenity not registered for that place")
+        amenities = dict(self.__amenities)
+        del amenities[amenity.id]
+        self.__amenities = amenities
+        self._changed()
+
+    def _cache_key(self):
+        """The place embeds its owner, amenity names and review texts"""
+        return (
+            self._version,
+            self.owner._cache_key(),
+            tuple(amenity._cache_key() for amenity in self.__amenities.values()),
+            tuple(review._version for review in self.__reviews.values()),
+        )
+
+    def last_modified(self):
+        return _from_micros(max(
+            [self._updated_at, self.owner._updated_at]
+            + [amenity._updated_at for amenity in self.__amenities.values()]
+            + [review._updated_at for review in self.__reviews.values()]
+        ))
+
+    def _field(self, name, expand):
+        """By default the place embeds its owner, amenity names and review
+        texts. When expand is given, embedded objects are either in full
+        or replaced by their ids."""
+        if name == "owner":
+            if expand is None or "owner" in expand:
+                return self.owner.to_dict()
+            return self.owner.id
+        if name == "amenities":
+            if expand is None:
+                return [amenity.name for amenity in self.__amenities.values()]
+            if "amenities" in expand:
+                return [amenity.to_dict() for amenity in self.__amenities.values()]
+            return list(self.__amenities)
+        if name == "reviews":
+            if expand is None:
+                return [review.text for review in self.__reviews.values()]
+            if "reviews" in expand:
+                return [review.to_dict() for review in self.__reviews.values()]
+            return list(self.__reviews)
+        if name == "average_rating":
+            return round(self.average_rating, 2)
+        return super()._field(name, expand)
@@ -1,5 +1,7 @@
-from app.models.base_model import BaseModel
+import sys
+from app.models.base_model import BaseModel, _from_micros
 from app.models.user import User
+from app.models.validators import check_type, check_length, check_range
 
 
 users_list = []
@@ -7,6 +9,11 @@ places_list = []
 
 
 class Review(BaseModel):
+    __slots__ = ("_place_id", "_user", "_rating", "_text")
+
+    FIELDS = ("id", "place_id", "rating", "text", "user")
+    EXPANDABLE = ("user",)
+
     def __init__(self, place_id, user, rating, text):
         """Initialize Review class with BaseModel"""
         super().__init__()
@@ -15,6 +22,16 @@ class Review(BaseModel):
         self.user = user  # User who wrote review
         self.rating = rating  # Setter use
 
+    @classmethod
+    def restore(cls, obj_id, created_at, updated_at, place_id, user, rating, text):
+        """Rebuild a review from trusted stored data, without validating it"""
+        review = cls._restored(obj_id, created_at, updated_at)
+        review._place_id = sys.intern(place_id)
+        review._user = user
+        review._rating = rating
+        review._text = text
+        return review
+
     @property
     def rating(self):
         """Return rating"""
@@ -23,11 +40,10 @@ class Review(BaseModel):
     @rating.setter
     def rating(self, value):
         """Set the rating, ensuring it is an integer from 1 to 5"""
-        if not isinstance(value, int):
-            raise TypeError("Rating must be an integer.")
-        if not (1 <= value <= 5):
-            raise ValueError("Rating must be from 1 to 5.")
+        check_type(value, int, "Rating must be an integer.")
+        check_range(value, "Rating must be from 1 to 5.", 1, 5)
         self._rating = value
+        self._changed()
 
     @property
     def text(self):
@@ -37,13 +53,11 @@ class Review(BaseModel):
     @text.setter
     def text(self, value):
         """Set the text with a minimum and maximum character length requirement"""
-        if not isinstance(value, str):
-            raise TypeError("Text must be a string.")
-        if len(value) < 4:
-            raise ValueError("Text must be at least 4 characters long.")
-        if len(value) > 100:
-            raise ValueError("Text must be 100 characters maximum.")
+        check_type(value, str, "Text must be a string.")
+        check_length(value, "Text must be at least 4 characters long.", minimum=4)
+        check_length(value, "Text must be 100 characters maximum.", maximum=100)
         self._text = value
+        self._changed()
 
     @property
     def place_id(self):
@@ -53,7 +67,9 @@ class Review(BaseModel):
     @place_id.setter
     def place_id(self, value):
         """Set the id of the place being reviewed"""
-        self._place_id = value
+        # Shared by all the reviews of a place
+        self._place_id = sys.intern(value) if isinstance(value, str) else value
+        self._changed()
 
     @property
     def user(self):
@@ -63,15 +79,20 @@ class Review(BaseModel):
     @user.setter
     def user(self, value):
         """Set the user who wrote the review, ensuring it's a User instance"""
-        if not isinstance(value, User):
-            raise TypeError("User must be an instance of the User class.")
+        check_type(value, User, "User must be an instance of the User class.")
         self._user = value
+        self._changed()
+
+    def _cache_key(self):
+        """The review embeds its author"""
+        return (self._version, self.user._cache_key())
+
+    def last_modified(self):
+        return _from_micros(max(self._updated_at, self.user._updated_at))
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "place_id": self.place_id,
-            "rating": self.rating,
-            "text": self.text,
-            "user": self.user.to_dict() if isinstance(self.user, User) else None,
-        }
+    def _field(self, name, expand):
+        if name == "user":
+            if expand is None or "user" in expand:
+                return self.user.to_dict()
+            return self.user.id
+        return super()._field(name, expand)
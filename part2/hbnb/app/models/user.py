@@ -1,10 +1,15 @@
 from app.models.base_model import BaseModel
-import re
+from app.models.validators import (
+    check_type, check_length, check_letters, check_email, email_key, EMAIL_PATTERN)
+import sys
 
 
 class User(BaseModel):
-    
-    EMAIL_REGEX = r'^[a-zA-Z0-9._-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,6}$'    
+    __slots__ = ("_first_name", "_last_name", "_email", "_email_key", "_is_admin")
+
+    FIELDS = ("id", "first_name", "last_name", "email")
+
+    EMAIL_REGEX = EMAIL_PATTERN.pattern
 
     def __init__(self, first_name, last_name, email, is_admin=False):
         super().__init__()
@@ -13,17 +18,28 @@ class User(BaseModel):
         self.email = email
         self.is_admin = is_admin
 
+    @classmethod
+    def restore(cls, obj_id, created_at, updated_at, first_name, last_name, email, is_admin):
+        """Rebuild a user from trusted stored data, without validating it"""
+        user = cls._restored(obj_id, created_at, updated_at)
+        user._first_name = sys.intern(first_name)
+        user._last_name = sys.intern(last_name)
+        user._email = email
+        user._email_key = email_key(email)
+        user._is_admin = is_admin
+        return user
+
     @property
     def first_name(self):
         return self._first_name
 
     @first_name.setter
     def first_name(self, value):
-        if not value.isalpha():
-            raise TypeError("First name must be a string of letters.")
-        elif len(value) > 50:
-            raise ValueError("First name must be 50 characters maximum.")
-        self._first_name = value
+        check_letters(value, "First name must be a string of letters.")
+        check_length(value, "First name must be 50 characters maximum.", maximum=50)
+        # Names repeat a lot, interning shares one string between users
+        self._first_name = sys.intern(value)
+        self._changed()
 
     @property
     def last_name(self):
@@ -31,11 +47,10 @@ class User(BaseModel):
 
     @last_name.setter
     def last_name(self, value):
-        if not value.isalpha():
-            raise TypeError("Last name must be a string of letters.")
-        elif len(value) > 50:
-            raise ValueError("Last name must be 50 characters maximum.")
-        self._last_name = value
+        check_letters(value, "Last name must be a string of letters.")
+        check_length(value, "Last name must be 50 characters maximum.", maximum=50)
+        self._last_name = sys.intern(value)
+        self._changed()
 
     @property
     def email(self):
@@ -43,9 +58,14 @@ class User(BaseModel):
 
     @email.setter
     def email(self, value):
-        if not re.fullmatch(self.EMAIL_REGEX, value):
-            raise ValueError("Invalid email format.")
-        self._email = value
+        self._email = check_email(value)
+        self._email_key = email_key(value)
+        self._changed()
+
+    @property
+    def email_key(self):
+        """Case-folded email, what uniqueness and lookups are based on"""
+        return self._email_key
 
     @property
     def is_admin(self):
@@ -53,14 +73,6 @@ class User(BaseModel):
 
     @is_admin.setter
     def is_admin(self, value):
-        if not isinstance(value, bool):
-            raise TypeError("is_admin must be a boolean (True or False).")
+        check_type(value, bool, "is_admin must be a boolean (True or False).")
         self._is_admin = value
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "email": self.email,
-        }
+        self._changed()
@@ -0,0 +1,51 @@
+'''
+This module gathers the checks shared by the model setters. Patterns are
+compiled once here instead of on every assignment.
+'''
+import re
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,6}')
+
+
+def check_type(value, types, message):
+    """Raise TypeError(message) unless value is an instance of types"""
+    if not isinstance(value, types):
+        raise TypeError(message)
+    return value
+
+
+def check_length(value, message, minimum=0, maximum=None):
+    """Raise ValueError(message) unless the length of value is within bounds"""
+    if len(value) < minimum or maximum is not None and len(value) > maximum:
+        raise ValueError(message)
+    return value
+
+
+def check_range(value, message, minimum=None, maximum=None):
+    """Raise ValueError(message) unless value is within bounds"""
+    if not (minimum is None or value >= minimum) or not (maximum is None or value <= maximum):
+        raise ValueError(message)
+    return value
+
+
+def check_letters(value, message):
+    """Raise TypeError(message) unless value is a non-empty string of letters"""
+    if not isinstance(value, str) or not value.isalpha():
+        raise TypeError(message)
+    return value
+
+
+def check_email(value):
+    if not isinstance(value, str) or not EMAIL_PATTERN.fullmatch(value):
+        raise ValueError("Invalid email format.")
+    return value
+
+
+def email_key(email):
+    """Normalized form of an email, two emails differing only by case
+    share it. Values that aren't strings are returned as they are."""
+    if not isinstance(email, str):
+        return email
+    key = email.casefold()
+    # Sharing the string when the email already is in normal form
+    return email if key == email else key
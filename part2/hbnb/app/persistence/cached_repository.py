@@ -0,0 +1,168 @@
+'''
+This module defines a caching decorator for the repositories whose
+lookups go to storage.
+'''
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from app.persistence.repository import Repository
+
+
+class CachedRepository(Repository):
+    """Serve get() from a bounded in-memory cache in front of another
+    repository.
+
+    The least recently used objects are evicted past max_size, and cached
+    objects older than ttl seconds are dropped and read again from the
+    repository (ttl=None keeps them until evicted, which is only right
+    when no other process writes to the storage). Writes go through to the
+    repository and the cache keeps the written objects, deletes evict
+    them. Objects found by get_by_attribute are cached too, collection
+    reads are passed through so a scan doesn't flush the hot objects.
+    """
+
+    # Called with True on a cache hit and False on a miss, when set
+    cache_observer = None
+
+    def __init__(self, repository, max_size=10000, ttl=None, thread_safe=False):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self._repository = repository
+        self._max_size = max_size
+        self._ttl = ttl
+        # obj_id -> (obj, time it was cached), least recently used first
+        self._entries = OrderedDict()
+        # Every cache access reorders the entries, so there is no read side
+        self._lock = threading.Lock() if thread_safe else nullcontext()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Scans are reported by the wrapped repository
+    @property
+    def scan_observer(self):
+        return self._repository.scan_observer
+
+    @scan_observer.setter
+    def scan_observer(self, observer):
+        self._repository.scan_observer = observer
+
+    def get(self, obj_id):
+        with self._lock:
+            entry = self._entries.get(obj_id)
+            if (entry is not None and self._ttl is not None
+                    and time.monotonic() - entry[1] >= self._ttl):
+                # Not holding the expired object while it is read again,
+                # or the repository could hand the same one back
+                del self._entries[obj_id]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(obj_id)
+                self.hits += 1
+                hit = True
+            else:
+                self.misses += 1
+                hit = False
+        self._observe(hit)
+        if hit:
+            return entry[0]
+
+        obj = self._repository.get(obj_id)
+        if obj is not None:
+            self._put(obj)
+        else:
+            self._discard(obj_id)
+        return obj
+
+    def add(self, obj):
+        self._repository.add(obj)
+        self._put(obj)
+
+    def add_many(self, objs):
+        self._repository.add_many(objs)
+        for obj in objs:
+            self._put(obj)
+
+    def update(self, obj_id, data):
+        try:
+            return self._repository.update(obj_id, data)
+        finally:
+            # Caching whatever state the object ended up in
+            obj = self._repository.get(obj_id)
+            if obj is not None:
+                self._put(obj)
+            else:
+                self._discard(obj_id)
+
+    def delete(self, obj_id):
+        try:
+            return self._repository.delete(obj_id)
+        finally:
+            self._discard(obj_id)
+
+    def get_all(self):
+        return self._repository.get_all()
+
+    def get_page(self, limit, after=None):
+        return self._repository.get_page(limit, after)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        if attr_name == 'id':
+            return self.get(attr_value)
+
+        obj = self._repository.get_by_attribute(attr_name, attr_value)
+        if obj is not None:
+            self._put(obj)
+        return obj
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        return self._repository.get_all_by_attribute(attr_name, attr_value)
+
+    def create_index(self, attr_name, unique=False):
+        self._repository.create_index(attr_name, unique)
+
+    def get_version(self):
+        return self._repository.get_version()
+
+    def get_last_modified(self):
+        return self._repository.get_last_modified()
+
+    def get_reloads(self):
+        return self._repository.get_reloads()
+
+    def clear(self):
+        """Empty the cache, the repository is untouched"""
+        with self._lock:
+            self._entries.clear()
+
+    def cache_stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __getattr__(self, name):
+        # Backend specific methods, like close() or compact()
+        return getattr(self._repository, name)
+
+    def _put(self, obj):
+        with self._lock:
+            self._entries[obj.id] = (obj, time.monotonic())
+            self._entries.move_to_end(obj.id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _discard(self, obj_id):
+        with self._lock:
+            self._entries.pop(obj_id, None)
+
+    def _observe(self, hit):
+        if self.cache_observer is not None:
+            self.cache_observer(hit)
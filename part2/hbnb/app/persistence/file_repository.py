@@ -0,0 +1,134 @@
+'''
+This module defines a durable repository backed by an append-only log.
+'''
+import json
+import os
+from app.persistence.repository import InMemoryRepository
+
+
+class FileRepository(InMemoryRepository):
+    """Keep the objects in memory and record every change in an append-only
+    write-ahead log, replayed at startup.
+
+    Once the log holds compact_every entries, the live records are written
+    to a snapshot and the log is emptied, so startup only ever replays one
+    snapshot plus a bounded log. A single process must own the files.
+    """
+
+    def __init__(self, path, encode, decode, compact_every=10000, fsync=False, thread_safe=False):
+        """path is the common prefix of the .snapshot and .log files,
+        encode turns an object into a JSON-compatible record and decode
+        turns a record back into an object"""
+        super().__init__(thread_safe)
+        self._encode = encode
+        self._decode = decode
+        self._snapshot_path = path + ".snapshot"
+        self._log_path = path + ".log"
+        self._compact_every = compact_every
+        self._fsync = fsync
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._load()
+        self._log = open(self._log_path, "a", encoding="utf-8")
+
+    # The write lock is held around both the change and its log entry,
+    # so the log follows the same order as the memory
+
+    def add(self, obj):
+        with self._lock.write():
+            super().add(obj)
+            self._append({"op": "put", "record": self._encode(obj)})
+
+    def add_many(self, objs):
+        with self._lock.write():
+            super().add_many(objs)
+            self._append(*({"op": "put", "record": self._encode(obj)} for obj in objs))
+
+    def update(self, obj_id, data):
+        with self._lock.write():
+            # A failed update leaves the object as it was, nothing to log
+            super().update(obj_id, data)
+            obj = self.get(obj_id)
+            if obj:
+                self._append({"op": "put", "record": self._encode(obj)})
+
+    def delete(self, obj_id):
+        with self._lock.write():
+            if self.get(obj_id):
+                super().delete(obj_id)
+                self._append({"op": "delete", "id": obj_id})
+
+    def compact(self):
+        """Write the live records to a new snapshot and empty the log"""
+        with self._lock.write():
+            self._compact()
+
+    def _compact(self):
+        temp_path = self._snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as snapshot:
+            for obj in self.get_all():
+                snapshot.write(json.dumps(self._encode(obj)) + "\n")
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temp_path, self._snapshot_path)
+
+        # Replaying the old log over the new snapshot would be harmless,
+        # so a crash before the truncation loses nothing
+        self._log.close()
+        self._log = open(self._log_path, "w", encoding="utf-8")
+        self._log_entries = 0
+
+    def close(self):
+        self._log.close()
+
+    def _append(self, *entries):
+        """Write entries to the log, flushed (and synced) once for all"""
+        if not entries:
+            return
+
+        self._log.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._log.flush()
+        if self._fsync:
+            os.fsync(self._log.fileno())
+
+        self._log_entries += len(entries)
+        if self._log_entries >= self._compact_every:
+            self._compact()
+
+    def _load(self):
+        # id -> record, later entries replace earlier ones in place
+        # so the original insertion order is kept
+        records = {}
+
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, encoding="utf-8") as snapshot:
+                for line in snapshot:
+                    record = json.loads(line)
+                    records[record["id"]] = record
+
+        self._log_entries = 0
+        if os.path.exists(self._log_path):
+            with open(self._log_path, "rb") as log:
+                lines = log.readlines()
+
+            valid_length = 0
+            for line in lines:
+                if not line.endswith(b"\n"):
+                    # Torn write from a crash, the entry never completed.
+                    # Cutting it off so the next entries start on a new line.
+                    os.truncate(self._log_path, valid_length)
+                    break
+                valid_length += len(line)
+
+                entry = json.loads(line)
+                if entry["op"] == "put":
+                    records[entry["record"]["id"]] = entry["record"]
+                else:
+                    records.pop(entry["id"], None)
+                self._log_entries += 1
+
+        for record in records.values():
+            super().add(self._decode(record))
@@ -0,0 +1,78 @@
+'''
+This module defines the locks used to share repositories between threads.
+'''
+import threading
+from contextlib import contextmanager, nullcontext
+
+
+class ReadWriteLock:
+    """Let many readers or a single writer in at a time.
+
+    Waiting writers go before new readers so a steady flow of reads can't
+    starve them. Both sides are reentrant, and the writer may read, but a
+    reader must not try to write.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        depth = getattr(self._local, "read_depth", 0)
+        nested = depth > 0 or self._writer == me
+
+        if not nested:
+            with self._condition:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+                self._readers += 1
+
+        self._local.read_depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.read_depth = depth
+            if not nested:
+                with self._condition:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writer_depth += 1
+            else:
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+                self._waiting_writers -= 1
+                self._writer = me
+                self._writer_depth = 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    self._condition.notify_all()
+
+
+class NullLock:
+    """Same interface as ReadWriteLock, for single-threaded use"""
+
+    def read(self):
+        return nullcontext()
+
+    def write(self):
+        return nullcontext()
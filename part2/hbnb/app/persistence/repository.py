@@ -1,10 +1,45 @@
+import copy
 from abc import ABC, abstractmethod
+from bisect import bisect_right
+from datetime import datetime
+from app.persistence.locks import ReadWriteLock, NullLock
+
+class UniqueConstraintError(ValueError):
+    """Raised when an object would share the value of a unique index"""
+
+    def __init__(self, attr_name):
+        super().__init__(f"Duplicate value for unique attribute '{attr_name}'")
+        self.attr_name = attr_name
+
+
+class IndexMigrationError(UniqueConstraintError):
+    """Raised when a unique index is declared over stored objects that
+    already share a value, which have to be fixed before it can exist"""
+
+    def __init__(self, attr_name, value, obj_ids):
+        ValueError.__init__(
+            self, f"Cannot create unique index on '{attr_name}': objects "
+            f"{', '.join(obj_ids)} share the value {value!r}")
+        self.attr_name = attr_name
+        self.value = value
+        self.obj_ids = obj_ids
+
 
 class Repository(ABC):
+    # Called with (attr_name, objects visited) after each lookup on a
+    # non-indexed attribute, when instrumentation is enabled
+    scan_observer = None
+
     @abstractmethod
     def add(self, obj):
         pass
 
+    @abstractmethod
+    def add_many(self, objs):
+        """Add several objects in a single operation, none of them is
+        added if one breaks a unique index"""
+        pass
+
     @abstractmethod
     def get(self, obj_id):
         pass
@@ -25,28 +60,272 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def get_page(self, limit, after=None):
+        pass
+
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        pass
+
+    @abstractmethod
+    def create_index(self, attr_name, unique=False):
+        pass
+
+    @abstractmethod
+    def get_version(self):
+        """Return a token that changes on every add, update or delete"""
+        pass
+
+    @abstractmethod
+    def get_last_modified(self):
+        """Return the time of the last add, update or delete"""
+        pass
+
+    def get_reloads(self):
+        """Return how many times loaded objects were dropped because
+        another process wrote to the storage, after checking for new
+        writes. Storage owned by a single process never reloads."""
+        return 0
+
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    def __init__(self, thread_safe=False):
         self._storage = {}
+        # attr_name -> {value: obj_id} for unique indexes
+        self._unique_indexes = {}
+        # attr_name -> {value: {obj_id: None}} for non-unique indexes,
+        # the inner dict keeps insertion order like _storage does
+        self._indexes = {}
+
+        # Insertion order used for pagination: _order holds increasing
+        # sequence numbers and _order_ids the matching object ids.
+        # Deleted objects stay there as tombstones until compaction.
+        self._next_seq = 0
+        self._order = []
+        self._order_ids = []
+        self._seq_by_id = {}
+        self._tombstones = 0
+
+        # Collection-level validators
+        self._version = 0
+        self._last_modified = datetime.now()
+
+        # Readers share the lock, writers get it alone, which also makes
+        # the unique checks and the insertion one atomic step
+        self._thread_safe = thread_safe
+        self._lock = ReadWriteLock() if thread_safe else NullLock()
+
+    def create_index(self, attr_name, unique=False):
+        """Declare a secondary index on attr_name, built from existing objects"""
+        with self._lock.write():
+            if unique:
+                _check_unique(attr_name, self._storage.values())
+                self._unique_indexes[attr_name] = {}
+            else:
+                self._indexes[attr_name] = {}
+
+            for obj in self._storage.values():
+                self._index_value(attr_name, getattr(obj, attr_name), obj.id)
 
     def add(self, obj):
-        self._storage[obj.id] = obj
+        with self._lock.write():
+            # Checking unique indexes before touching anything
+            for attr_name, index in self._unique_indexes.items():
+                owner_id = index.get(getattr(obj, attr_name))
+                if owner_id is not None and owner_id != obj.id:
+                    raise UniqueConstraintError(attr_name)
+
+            self._insert(obj)
+            self._touch()
+
+    def add_many(self, objs):
+        with self._lock.write():
+            # Checking the whole batch, against the store and itself,
+            # before touching anything
+            for attr_name, index in self._unique_indexes.items():
+                batch_values = set()
+                for obj in objs:
+                    value = getattr(obj, attr_name)
+                    owner_id = index.get(value)
+                    if value in batch_values or (owner_id is not None and owner_id != obj.id):
+                        raise UniqueConstraintError(attr_name)
+                    batch_values.add(value)
+
+            for obj in objs:
+                self._insert(obj)
+            if objs:
+                self._touch()
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
 
     def get_all(self):
+        if self._thread_safe:
+            # A copy, a live view could change while the caller iterates
+            with self._lock.read():
+                return list(self._storage.values())
         return self._storage.values()
 
     def update(self, obj_id, data):
-        obj = self.get(obj_id)
-        if obj:
-            obj.update(data)
+        with self._lock.write():
+            obj = self.get(obj_id)
+            if obj:
+                # The object validates the data itself and indexed values
+                # may be derived from it (email_key from email), so the
+                # update is tried on a copy and its indexed values checked
+                # before touching anything
+                trial = copy.copy(obj)
+                trial.update(data)
+                for attr_name, index in self._unique_indexes.items():
+                    owner_id = index.get(getattr(trial, attr_name))
+                    if owner_id is not None and owner_id != obj_id:
+                        raise UniqueConstraintError(attr_name)
+
+                self._unindex(obj)
+                obj.update(data)
+                self._index(obj)
+                self._touch()
 
     def delete(self, obj_id):
-        if obj_id in self._storage:
-            del self._storage[obj_id]
+        with self._lock.write():
+            if obj_id in self._storage:
+                self._unindex(self._storage[obj_id])
+                del self._storage[obj_id]
+                del self._seq_by_id[obj_id]
+
+                self._tombstones += 1
+                if self._tombstones > len(self._order) // 2:
+                    self._compact_order()
+                self._touch()
+
+    def get_version(self):
+        return self._version
+
+    def get_last_modified(self):
+        return self._last_modified
+
+    def get_page(self, limit, after=None):
+        """Return up to limit objects in insertion order, starting after the
+        sequence number `after`, and the sequence number to resume from
+        (None when there is nothing left)"""
+        with self._lock.read():
+            start = 0 if after is None else bisect_right(self._order, after)
+            page = []
+            for position in range(start, len(self._order)):
+                obj_id = self._order_ids[position]
+                if self._seq_by_id.get(obj_id) != self._order[position]:
+                    continue  # Tombstone
+
+                if len(page) == limit:
+                    return page, self._seq_by_id[page[-1].id]
+                page.append(self._storage[obj_id])
+
+            return page, None
 
     def get_by_attribute(self, attr_name, attr_value):
-        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+        if attr_name == 'id':
+            return self.get(attr_value)
+
+        with self._lock.read():
+            if attr_name in self._unique_indexes:
+                return self.get(self._unique_indexes[attr_name].get(attr_value))
+
+            if attr_name in self._indexes:
+                ids = self._indexes[attr_name].get(attr_value)
+                return self.get(next(iter(ids))) if ids else None
+
+            # Fallback for non-indexed attributes
+            return _scan_first(self, self._storage.values(), attr_name, attr_value)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        with self._lock.read():
+            if attr_name in self._indexes:
+                ids = self._indexes[attr_name].get(attr_value, {})
+                return [self._storage[obj_id] for obj_id in ids]
+
+            if attr_name in self._unique_indexes or attr_name == 'id':
+                obj = self.get_by_attribute(attr_name, attr_value)
+                return [obj] if obj else []
+
+            # Fallback for non-indexed attributes
+            if self.scan_observer:
+                self.scan_observer(attr_name, len(self._storage))
+            return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
+
+    def _insert(self, obj):
+        self._storage[obj.id] = obj
+        self._index(obj)
+
+        if obj.id not in self._seq_by_id:
+            self._seq_by_id[obj.id] = self._next_seq
+            self._order.append(self._next_seq)
+            self._order_ids.append(obj.id)
+            self._next_seq += 1
+
+    def _touch(self):
+        self._version += 1
+        self._last_modified = datetime.now()
+
+    def _compact_order(self):
+        live = [(seq, obj_id) for seq, obj_id in zip(self._order, self._order_ids)
+                if self._seq_by_id.get(obj_id) == seq]
+        self._order = [seq for seq, _ in live]
+        self._order_ids = [obj_id for _, obj_id in live]
+        self._tombstones = 0
+
+    def _index_value(self, attr_name, value, obj_id):
+        if attr_name in self._unique_indexes:
+            index = self._unique_indexes[attr_name]
+            owner_id = index.get(value)
+            if owner_id is not None and owner_id != obj_id:
+                raise UniqueConstraintError(attr_name)
+            index[value] = obj_id
+        else:
+            self._indexes[attr_name].setdefault(value, {})[obj_id] = None
+
+    def _index(self, obj):
+        for attr_name in self._unique_indexes:
+            self._index_value(attr_name, getattr(obj, attr_name), obj.id)
+        for attr_name in self._indexes:
+            self._index_value(attr_name, getattr(obj, attr_name), obj.id)
+
+    def _unindex(self, obj):
+        for attr_name, index in self._unique_indexes.items():
+            value = getattr(obj, attr_name)
+            if index.get(value) == obj.id:
+                del index[value]
+        for attr_name, index in self._indexes.items():
+            value = getattr(obj, attr_name)
+            ids = index.get(value)
+            if ids and obj.id in ids:
+                del ids[obj.id]
+                if not ids:
+                    del index[value]
+
+
+def _check_unique(attr_name, objs):
+    """Raise IndexMigrationError for the first value of attr_name shared
+    by several of objs"""
+    owners = {}
+    for obj in objs:
+        value = getattr(obj, attr_name)
+        owner_id = owners.setdefault(value, obj.id)
+        if owner_id != obj.id:
+            raise IndexMigrationError(attr_name, value, [owner_id, obj.id])
+
+
+def _scan_first(repo, objs, attr_name, attr_value):
+    """Return the first of objs whose attribute matches, reporting the
+    length of the scan to the repository's observer"""
+    visited = 0
+    for obj in objs:
+        visited += 1
+        if getattr(obj, attr_name) == attr_value:
+            break
+    else:
+        obj = None
+
+    if repo.scan_observer:
+        repo.scan_observer(attr_name, visited)
+    return obj
@@ -0,0 +1,98 @@
+'''
+This module converts the Business Logic objects to plain records and back,
+for the repositories that store them outside of memory.
+References to other objects are stored by id and resolved through the facade.
+'''
+from datetime import datetime
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+
+
+def to_record(obj):
+    """Return a JSON-compatible dict holding the whole state of obj"""
+    record = {
+        "id": obj.id,
+        "created_at": obj.created_at.isoformat(),
+        "updated_at": obj.updated_at.isoformat(),
+    }
+
+    if isinstance(obj, User):
+        record.update({
+            "first_name": obj.first_name,
+            "last_name": obj.last_name,
+            "email": obj.email,
+            "is_admin": obj.is_admin,
+        })
+    elif isinstance(obj, Amenity):
+        record["name"] = obj.name
+    elif isinstance(obj, Place):
+        record.update({
+            "title": obj.title,
+            "description": obj.description,
+            "price": obj.price,
+            "latitude": obj.latitude,
+            "longitude": obj.longitude,
+            "owner_id": obj.owner.id,
+            "amenity_ids": [amenity.id for amenity in obj.amenities],
+        })
+    elif isinstance(obj, Review):
+        record.update({
+            "place_id": obj.place_id,
+            "user_id": obj.user.id,
+            "rating": obj.rating,
+            "text": obj.text,
+        })
+    else:
+        raise TypeError(f"Cannot serialize {type(obj).__name__} objects.")
+
+    return record
+
+
+def user_from_record(record, facade):
+    user = User(record["first_name"], record["last_name"], record["email"], record["is_admin"])
+    return _restore_base(user, record)
+
+
+def amenity_from_record(record, facade):
+    return _restore_base(Amenity(record["name"]), record)
+
+
+def place_from_record(record, facade, with_reviews=False):
+    """Rebuild a place, its owner and amenities must already be loaded.
+    Reviews are attached here when with_reviews is set, otherwise by the
+    facade once they are loaded."""
+    place = Place(
+        record["title"],
+        record["description"],
+        record["price"],
+        record["latitude"],
+        record["longitude"],
+        facade.user_repo.get(record["owner_id"]),
+    )
+    for amenity_id in record["amenity_ids"]:
+        place.add_amenity(facade.amenity_repo.get(amenity_id))
+    _restore_base(place, record)
+
+    if with_reviews:
+        for review in facade.review_repo.get_all_by_attribute('place_id', place.id):
+            place.add_review(review)
+    return place
+
+
+def review_from_record(record, facade):
+    review = Review(
+        record["place_id"],
+        facade.user_repo.get(record["user_id"]),
+        record["rating"],
+        record["text"],
+    )
+    return _restore_base(review, record)
+
+
+def _restore_base(obj, record):
+    obj.id = record["id"]
+    obj.created_at = datetime.fromisoformat(record["created_at"])
+    obj.updated_at = datetime.fromisoformat(record["updated_at"])
+    return obj
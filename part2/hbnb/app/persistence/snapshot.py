@@ -0,0 +1,277 @@
+'''
+This module writes the whole state of the facade to a compact binary
+snapshot and reads it back, to warm start an instance without replaying
+its history.
+
+A snapshot is columnar: each model is stored as one typed array per
+attribute. Every string, ids included, is stored once in a string table
+the columns refer to by index, so references between objects (place
+owners and amenities, review authors and places) are indexes of ids.
+Snapshots are memory-mapped when read, the columns are decoded straight
+from the mapping, value by value, without copying the file.
+'''
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+
+MAGIC = b"HBNBSNAP"
+FORMAT_VERSION = 1
+# Magic, format version and header length
+_PREAMBLE = struct.Struct("<8sII")
+# Columns start at a multiple of this so they can be cast in place
+_ALIGNMENT = 8
+
+# Bits of the places.integers column, set when the number was an int
+_INT_PRICE, _INT_LATITUDE, _INT_LONGITUDE = 1, 2, 4
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class _StringTable:
+    """Every distinct string once, in the order they were first added"""
+
+    def __init__(self):
+        self._indexes = {}
+        self._parts = []
+        # Code point offsets, string i spans offsets[i]:offsets[i + 1]
+        self.offsets = array.array("Q", [0])
+
+    def add(self, value):
+        index = self._indexes.get(value)
+        if index is None:
+            index = self._indexes[value] = len(self._parts)
+            self._parts.append(value)
+            self.offsets.append(self.offsets[-1] + len(value))
+        return index
+
+    def data(self):
+        return array.array("B", "".join(self._parts).encode())
+
+
+def dump(path, users, amenities, places, reviews):
+    """Write the given objects to a snapshot at path, replacing it
+    atomically. Returns the number of objects written per model."""
+    strings = _StringTable()
+    columns = {}
+
+    def column(name, typecode, values):
+        columns[name] = array.array(typecode, values)
+
+    def base_columns(model, objs):
+        column(f"{model}.id", "I", (strings.add(obj.id) for obj in objs))
+        column(f"{model}.created_at", "q", (obj._created_at for obj in objs))
+        column(f"{model}.updated_at", "q", (obj._updated_at for obj in objs))
+
+    users, amenities = list(users), list(amenities)
+    places, reviews = list(places), list(reviews)
+
+    base_columns("users", users)
+    column("users.first_name", "I", (strings.add(user.first_name) for user in users))
+    column("users.last_name", "I", (strings.add(user.last_name) for user in users))
+    column("users.email", "I", (strings.add(user.email) for user in users))
+    column("users.is_admin", "B", (user.is_admin for user in users))
+
+    base_columns("amenities", amenities)
+    column("amenities.name", "I", (strings.add(amenity.name) for amenity in amenities))
+
+    base_columns("places", places)
+    column("places.title", "I", (strings.add(place.title) for place in places))
+    column("places.description", "I", (strings.add(place.description) for place in places))
+    column("places.price", "d", (place.price for place in places))
+    column("places.latitude", "d", (place.latitude for place in places))
+    column("places.longitude", "d", (place.longitude for place in places))
+    column("places.integers", "B", (
+        isinstance(place.price, int) * _INT_PRICE
+        | isinstance(place.latitude, int) * _INT_LATITUDE
+        | isinstance(place.longitude, int) * _INT_LONGITUDE
+        for place in places
+    ))
+    column("places.owner", "I", (strings.add(place.owner.id) for place in places))
+    # The amenities of place i are amenities[amenity_offsets[i]:amenity_offsets[i + 1]]
+    amenity_offsets = array.array("Q", [0])
+    place_amenities = array.array("I")
+    for place in places:
+        place_amenities.extend(strings.add(amenity.id) for amenity in place.amenities)
+        amenity_offsets.append(len(place_amenities))
+    columns["places.amenity_offsets"] = amenity_offsets
+    columns["places.amenities"] = place_amenities
+
+    base_columns("reviews", reviews)
+    column("reviews.place", "I", (strings.add(review.place_id) for review in reviews))
+    column("reviews.user", "I", (strings.add(review.user.id) for review in reviews))
+    column("reviews.rating", "B", (review.rating for review in reviews))
+    column("reviews.text", "I", (strings.add(review.text) for review in reviews))
+
+    columns["strings.offsets"] = strings.offsets
+    columns["strings.data"] = strings.data()
+
+    counts = {"users": len(users), "amenities": len(amenities),
+              "places": len(places), "reviews": len(reviews)}
+    _write(path, counts, columns)
+    return counts
+
+
+def load(path):
+    """Read a snapshot, return its users, amenities, places and reviews as
+    four lists. Snapshots are trusted, as written by dump() from valid
+    objects: objects are rebuilt without validating them again, only the
+    references are checked and resolved within the snapshot."""
+    with open(path, "rb") as snapshot_file:
+        if os.fstat(snapshot_file.fileno()).st_size < _PREAMBLE.size:
+            raise SnapshotError(f"{path} is not a snapshot")
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            view = memoryview(buffer)
+            try:
+                return _Reader(view, path).objects()
+            finally:
+                view.release()
+
+
+class _Reader:
+    def __init__(self, view, path):
+        self._view = view
+        magic, version, header_length = _PREAMBLE.unpack_from(view)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot format version: {version}")
+
+        header = json.loads(bytes(view[_PREAMBLE.size:_PREAMBLE.size + header_length]))
+        # Column offsets are relative to the first column
+        self._data_start = _aligned(_PREAMBLE.size + header_length)
+        self.counts = header["counts"]
+        self._columns = header["columns"]
+        # Snapshots from a machine of the other byte order are swapped on read
+        self._swap = header["byteorder"] != sys.byteorder
+        # Views into the mapping, released before it is closed
+        self._casts = []
+
+    def column(self, name):
+        typecode, offset, count = self._columns[name]
+        start = self._data_start + offset
+        raw = self._view[start:start + count * array.array(typecode).itemsize]
+        if self._swap:
+            values = array.array(typecode, bytes(raw))
+            values.byteswap()
+            return values
+
+        values = raw.cast(typecode)
+        self._casts.append(values)
+        return values
+
+    def strings(self):
+        text = bytes(self.column("strings.data")).decode()
+        offsets = self.column("strings.offsets").tolist()
+        return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    def objects(self):
+        try:
+            return self._objects()
+        finally:
+            for values in self._casts:
+                values.release()
+
+    def _objects(self):
+        strings = self.strings()
+        column = self.column
+
+        def base(model):
+            return zip((strings[index] for index in column(f"{model}.id")),
+                       column(f"{model}.created_at"), column(f"{model}.updated_at"))
+
+        users = [
+            User.restore(*identity, strings[first_name], strings[last_name],
+                         strings[email], bool(is_admin))
+            for identity, first_name, last_name, email, is_admin in zip(
+                base("users"), column("users.first_name"), column("users.last_name"),
+                column("users.email"), column("users.is_admin"))
+        ]
+        amenities = [
+            Amenity.restore(*identity, strings[name])
+            for identity, name in zip(base("amenities"), column("amenities.name"))
+        ]
+
+        users_by_id = {user.id: user for user in users}
+        amenities_by_id = {amenity.id: amenity for amenity in amenities}
+
+        places = []
+        # Sliced for every place, which lists do much faster than views
+        amenity_offsets = column("places.amenity_offsets").tolist()
+        place_amenities = column("places.amenities").tolist()
+        for i, (identity, title, description, price, latitude, longitude, integers, owner) in enumerate(zip(
+                base("places"), column("places.title"), column("places.description"),
+                column("places.price"), column("places.latitude"), column("places.longitude"),
+                column("places.integers"), column("places.owner"))):
+            places.append(Place.restore(
+                *identity,
+                strings[title],
+                strings[description],
+                int(price) if integers & _INT_PRICE else price,
+                int(latitude) if integers & _INT_LATITUDE else latitude,
+                int(longitude) if integers & _INT_LONGITUDE else longitude,
+                _resolve(users_by_id, strings[owner], "owner"),
+                [_resolve(amenities_by_id, strings[amenity], "amenity")
+                 for amenity in place_amenities[amenity_offsets[i]:amenity_offsets[i + 1]]],
+            ))
+
+        # Reviews are attached to their places by the facade
+        place_ids = {place.id for place in places}
+        reviews = []
+        for identity, place, user, rating, text in zip(
+                base("reviews"), column("reviews.place"), column("reviews.user"),
+                column("reviews.rating"), column("reviews.text")):
+            if strings[place] not in place_ids:
+                raise SnapshotError(f"Snapshot references a missing place: {strings[place]}")
+            reviews.append(Review.restore(
+                *identity, strings[place], _resolve(users_by_id, strings[user], "user"),
+                rating, strings[text]))
+
+        return users, amenities, places, reviews
+
+
+def _resolve(objs_by_id, obj_id, kind):
+    obj = objs_by_id.get(obj_id)
+    if obj is None:
+        raise SnapshotError(f"Snapshot references a missing {kind}: {obj_id}")
+    return obj
+
+
+def _write(path, counts, columns):
+    """Lay out the header and the aligned columns, then move the file in place"""
+    layout = {}
+    position = 0
+    for name, values in columns.items():
+        position = _aligned(position)
+        layout[name] = [values.typecode, position, len(values)]
+        position += len(values) * values.itemsize
+
+    header = json.dumps({"counts": counts, "byteorder": sys.byteorder, "columns": layout}).encode()
+    data_start = _aligned(_PREAMBLE.size + len(header))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as snapshot_file:
+        snapshot_file.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        snapshot_file.write(header)
+        for name, values in columns.items():
+            snapshot_file.write(b"\0" * (data_start + layout[name][1] - snapshot_file.tell()))
+            values.tofile(snapshot_file)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(temp_path, path)
+
+
+def _aligned(position):
+    return -(-position // _ALIGNMENT) * _ALIGNMENT
@@ -0,0 +1,79 @@
+'''
+This module defines a sorted index used for range queries on numeric attributes.
+'''
+from bisect import bisect_left, bisect_right
+
+
+class SortedIndex:
+    """Keep object ids sorted by a key, so range queries and counts are a
+    bisect away instead of a scan"""
+
+    def __init__(self):
+        # Parallel sorted lists: _keys to bisect on the key alone,
+        # _entries to find the exact (key, obj_id) pair to remove
+        self._keys = []
+        self._entries = []
+        # obj_id -> key
+        self._key_by_id = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def insert(self, obj_id, key):
+        """Add an object, or move it if its key changed"""
+        if obj_id in self._key_by_id and self._key_by_id[obj_id] == key:
+            return
+        self.remove(obj_id)
+
+        position = bisect_right(self._entries, (key, obj_id))
+        self._entries.insert(position, (key, obj_id))
+        self._keys.insert(position, key)
+        self._key_by_id[obj_id] = key
+
+    def insert_many(self, items):
+        """Add or move several objects given as (obj_id, key) pairs, sorting
+        once instead of inserting them one by one"""
+        entries = []
+        # The last key given for an object wins
+        for obj_id, key in dict(items).items():
+            if obj_id in self._key_by_id:
+                if self._key_by_id[obj_id] == key:
+                    continue
+                self.remove(obj_id)
+            entries.append((key, obj_id))
+            self._key_by_id[obj_id] = key
+
+        if entries:
+            self._entries.extend(entries)
+            self._entries.sort()
+            self._keys = [key for key, _ in self._entries]
+
+    def remove(self, obj_id):
+        if obj_id not in self._key_by_id:
+            return
+
+        key = self._key_by_id.pop(obj_id)
+        position = bisect_left(self._entries, (key, obj_id))
+        del self._entries[position]
+        del self._keys[position]
+
+    def key_of(self, obj_id):
+        return self._key_by_id.get(obj_id)
+
+    def count_range(self, min_key=None, max_key=None):
+        """Number of objects with min_key <= key <= max_key"""
+        low, high = self._bounds(min_key, max_key)
+        return max(0, high - low)
+
+    def range(self, min_key=None, max_key=None, reverse=False):
+        """Ids of the objects with min_key <= key <= max_key, sorted by key"""
+        low, high = self._bounds(min_key, max_key)
+        entries = self._entries[low:high]
+        if reverse:
+            entries.reverse()
+        return [obj_id for _, obj_id in entries]
+
+    def _bounds(self, min_key, max_key):
+        low = 0 if min_key is None else bisect_left(self._keys, min_key)
+        high = len(self._keys) if max_key is None else bisect_right(self._keys, max_key)
+        return low, high
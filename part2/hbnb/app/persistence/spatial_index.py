@@ -0,0 +1,108 @@
+'''
+This module defines a grid-based spatial index used to find places by location.
+'''
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometers"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """Bucket points into cells of cell_size degrees, so an area query only
+    looks at the cells it overlaps instead of every point"""
+
+    def __init__(self, cell_size=1.0):
+        self.cell_size = cell_size
+        # (row, col) -> {obj_id: (lat, lon)}
+        self._cells = {}
+        # obj_id -> (lat, lon)
+        self._points = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def insert(self, obj_id, lat, lon):
+        """Add a point, or move it if it is already indexed"""
+        self.remove(obj_id)
+        self._points[obj_id] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), {})[obj_id] = (lat, lon)
+
+    def remove(self, obj_id):
+        point = self._points.pop(obj_id, None)
+        if point is None:
+            return
+
+        cell = self._cell(*point)
+        del self._cells[cell][obj_id]
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def query_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """Return the ids of the points inside the box.
+        A box with min_lon > max_lon crosses the antimeridian."""
+        if min_lon > max_lon:
+            return (self.query_bbox(min_lat, min_lon, max_lat, 180)
+                    + self.query_bbox(min_lat, -180, max_lat, max_lon))
+
+        results = []
+        for points in self._cells_in(min_lat, min_lon, max_lat, max_lon):
+            for obj_id, (lat, lon) in points.items():
+                if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
+                    results.append(obj_id)
+        return results
+
+    def query_radius(self, lat, lon, radius_km):
+        """Return (obj_id, distance_km) for the points within radius_km,
+        closest first"""
+        lat_delta = radius_km / KM_PER_DEGREE
+        min_lat, max_lat = max(-90, lat - lat_delta), min(90, lat + lat_delta)
+
+        # Longitude degrees shrink towards the poles
+        cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+        if cos_lat <= 0 or lat_delta / cos_lat >= 180:
+            min_lon, max_lon = -180, 180
+        else:
+            lon_delta = lat_delta / cos_lat
+            min_lon, max_lon = lon - lon_delta, lon + lon_delta
+            if min_lon < -180:
+                min_lon += 360
+            if max_lon > 180:
+                max_lon -= 360
+
+        results = []
+        for obj_id in self.query_bbox(min_lat, min_lon, max_lat, max_lon):
+            distance = haversine_km(lat, lon, *self._points[obj_id])
+            if distance <= radius_km:
+                results.append((obj_id, distance))
+
+        results.sort(key=lambda result: result[1])
+        return results
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_size), math.floor(lon / self.cell_size))
+
+    def _cells_in(self, min_lat, min_lon, max_lat, max_lon):
+        """Yield the non-empty cells overlapping the box"""
+        min_row, min_col = self._cell(min_lat, min_lon)
+        max_row, max_col = self._cell(max_lat, max_lon)
+
+        # For very large boxes, walking the occupied cells is cheaper
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self._cells):
+            for (row, col), points in self._cells.items():
+                if min_row <= row <= max_row and min_col <= col <= max_col:
+                    yield points
+            return
+
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                points = self._cells.get((row, col))
+                if points:
+                    yield points
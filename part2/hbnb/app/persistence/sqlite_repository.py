@@ -0,0 +1,313 @@
+'''
+This module defines a durable repository stored in a SQLite database.
+'''
+import copy
+import json
+import sqlite3
+import threading
+import weakref
+from contextlib import nullcontext
+from datetime import datetime
+from app.persistence.repository import (
+    Repository, UniqueConstraintError, IndexMigrationError, _scan_first)
+
+
+class SQLiteRepository(Repository):
+    """Store one model in a table of a SQLite database.
+
+    Each row holds the JSON record of an object plus one column per
+    declared index, so get_by_attribute on an indexed attribute is an
+    indexed SQL query. Each thread gets its own connection, the database
+    runs in WAL mode so other processes can read while this one writes,
+    and the SQL strings are built once so sqlite3 reuses its prepared
+    statements.
+
+    Loaded objects are kept in an identity map while something references
+    them, so changes made to an object by the facade are the ones saved
+    by update(). The map is dropped when the version of the table shows
+    another process wrote to it, so reads then load the current rows.
+    """
+
+    def __init__(self, path, table, encode, decode, thread_safe=False):
+        """encode turns an object into a JSON-compatible record and
+        decode turns a record back into an object"""
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+
+        self._path = path
+        self._table = table
+        self._encode = encode
+        self._decode = decode
+        self._local = threading.local()
+        self._identity_map = weakref.WeakValueDictionary()
+        # Version of the table the identity map is current with, and the
+        # number of times it was dropped for writes of other processes
+        self._version = None
+        self._reloads = 0
+        # Guards the identity map and its version, never held while
+        # waiting for the database
+        self._lock = threading.RLock() if thread_safe else nullcontext()
+        # attr_name -> unique
+        self._indexed = {}
+
+        with self._connection() as connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "id TEXT NOT NULL UNIQUE, "
+                "data TEXT NOT NULL)"
+            )
+            # One version row per table, bumped in the same transaction
+            # as every write so all processes see the same validators
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS hbnb_versions ("
+                "name TEXT PRIMARY KEY, "
+                "version INTEGER NOT NULL, "
+                "modified TEXT NOT NULL)"
+            )
+            connection.execute(
+                "INSERT OR IGNORE INTO hbnb_versions VALUES (?, 0, ?)",
+                (table, datetime.now().isoformat()))
+        self._prepare_statements()
+
+    def create_index(self, attr_name, unique=False):
+        """Add a column for attr_name with a SQL index on it,
+        filled from the existing rows"""
+        if not attr_name.isidentifier() or attr_name in ("seq", "id", "data"):
+            raise ValueError(f"Cannot index attribute: {attr_name}")
+
+        connection = self._connection()
+        columns = [row[1] for row in connection.execute(f"PRAGMA table_info({self._table})")]
+        with connection:
+            # Explicitly, so the new column is rolled back with its
+            # values if the index can't be created
+            connection.execute("BEGIN")
+            if attr_name not in columns:
+                connection.execute(f"ALTER TABLE {self._table} ADD COLUMN {attr_name}")
+                for obj in self.get_all():
+                    connection.execute(
+                        f"UPDATE {self._table} SET {attr_name} = ? WHERE id = ?",
+                        (getattr(obj, attr_name), obj.id))
+
+            if unique:
+                # The same error as the other backends, rather than
+                # the IntegrityError of CREATE UNIQUE INDEX
+                duplicate = connection.execute(
+                    f"SELECT {attr_name}, group_concat(id) FROM {self._table} "
+                    f"WHERE {attr_name} IS NOT NULL GROUP BY {attr_name} "
+                    f"HAVING count(*) > 1 LIMIT 1").fetchone()
+                if duplicate:
+                    raise IndexMigrationError(attr_name, duplicate[0], duplicate[1].split(","))
+
+            connection.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+                f"idx_{self._table}_{attr_name} ON {self._table} ({attr_name})")
+
+        self._indexed[attr_name] = unique
+        self._prepare_statements()
+
+    def add(self, obj):
+        try:
+            with self._connection() as connection:
+                connection.execute(self._insert_sql, self._row(obj))
+                self._touch(connection)
+        except sqlite3.IntegrityError as e:
+            # Message looks like "UNIQUE constraint failed: users.email"
+            raise UniqueConstraintError(str(e).rsplit(".", 1)[-1])
+        with self._lock:
+            self._identity_map[obj.id] = obj
+
+    def add_many(self, objs):
+        try:
+            # One transaction, so either every row is inserted or none
+            with self._connection() as connection:
+                connection.executemany(self._insert_sql, [self._row(obj) for obj in objs])
+                if objs:
+                    self._touch(connection)
+        except sqlite3.IntegrityError as e:
+            raise UniqueConstraintError(str(e).rsplit(".", 1)[-1])
+        with self._lock:
+            for obj in objs:
+                self._identity_map[obj.id] = obj
+
+    def get(self, obj_id):
+        connection = self._connection()
+        self._sync(connection)
+        obj = self._identity_map.get(obj_id)
+        if obj is not None:
+            return obj
+
+        row = connection.execute(self._select_by_id_sql, (obj_id,)).fetchone()
+        return self._load(row[0], row[1]) if row else None
+
+    def get_all(self):
+        connection = self._connection()
+        self._sync(connection)
+        rows = connection.execute(self._select_all_sql).fetchall()
+        return [self._load(obj_id, data) for obj_id, data in rows]
+
+    def get_page(self, limit, after=None):
+        connection = self._connection()
+        self._sync(connection)
+        rows = connection.execute(
+            self._select_page_sql, (-1 if after is None else after, limit + 1)).fetchall()
+
+        page = [self._load(obj_id, data) for _, obj_id, data in rows[:limit]]
+        next_key = rows[limit - 1][0] if len(rows) > limit else None
+        return page, next_key
+
+    def update(self, obj_id, data):
+        # The caller may have changed the loaded object before calling
+        # update(), that object is the one saved even if the table moved on
+        obj = self._identity_map.get(obj_id) or self.get(obj_id)
+        if not obj:
+            return
+
+        # The update is validated and saved from a copy, the object is
+        # only changed once its row is written. Indexed values may be
+        # derived from the data (email_key from email), the copy has them.
+        trial = copy.copy(obj)
+        trial.update(data)
+        for attr_name, unique in self._indexed.items():
+            if unique:
+                owner = self.get_by_attribute(attr_name, getattr(trial, attr_name))
+                if owner and owner.id != obj_id:
+                    raise UniqueConstraintError(attr_name)
+
+        try:
+            with self._connection() as connection:
+                row = self._row(trial)
+                connection.execute(self._update_sql, row[1:] + row[:1])
+                self._touch(connection)
+        except sqlite3.IntegrityError as e:
+            raise UniqueConstraintError(str(e).rsplit(".", 1)[-1])
+
+        obj.update(data)
+        # The saved modification time, not the one of the second update
+        obj._updated_at = trial._updated_at
+        with self._lock:
+            self._identity_map[obj_id] = obj
+
+    def delete(self, obj_id):
+        with self._connection() as connection:
+            if connection.execute(self._delete_sql, (obj_id,)).rowcount:
+                self._touch(connection)
+        with self._lock:
+            self._identity_map.pop(obj_id, None)
+
+    def get_version(self):
+        return self._connection().execute(
+            "SELECT version FROM hbnb_versions WHERE name = ?", (self._table,)).fetchone()[0]
+
+    def get_reloads(self):
+        self._sync(self._connection())
+        return self._reloads
+
+    def get_last_modified(self):
+        modified = self._connection().execute(
+            "SELECT modified FROM hbnb_versions WHERE name = ?", (self._table,)).fetchone()[0]
+        return datetime.fromisoformat(modified)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        if attr_name == 'id':
+            return self.get(attr_value)
+
+        if attr_name in self._indexed:
+            connection = self._connection()
+            self._sync(connection)
+            row = connection.execute(
+                f"SELECT id, data FROM {self._table} WHERE {attr_name} = ? ORDER BY seq LIMIT 1",
+                (attr_value,)).fetchone()
+            return self._load(row[0], row[1]) if row else None
+
+        # Fallback for non-indexed attributes
+        return _scan_first(self, self.get_all(), attr_name, attr_value)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        if attr_name == 'id':
+            obj = self.get(attr_value)
+            return [obj] if obj else []
+
+        if attr_name in self._indexed:
+            connection = self._connection()
+            self._sync(connection)
+            rows = connection.execute(
+                f"SELECT id, data FROM {self._table} WHERE {attr_name} = ? ORDER BY seq",
+                (attr_value,)).fetchall()
+            return [self._load(obj_id, data) for obj_id, data in rows]
+
+        # Fallback for non-indexed attributes
+        objs = self.get_all()
+        if self.scan_observer:
+            self.scan_observer(attr_name, len(objs))
+        return [obj for obj in objs if getattr(obj, attr_name) == attr_value]
+
+    def close(self):
+        """Close the connection of the calling thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            del self._local.connection
+
+    def _connection(self):
+        """Return the connection of the calling thread, opening it if needed"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _prepare_statements(self):
+        table = self._table
+        columns = list(self._indexed)
+        self._insert_sql = (
+            f"INSERT INTO {table} (id, data{''.join(', ' + c for c in columns)}) "
+            f"VALUES (?, ?{', ?' * len(columns)})")
+        self._update_sql = (
+            f"UPDATE {table} SET data = ?{''.join(f', {c} = ?' for c in columns)} WHERE id = ?")
+        self._delete_sql = f"DELETE FROM {table} WHERE id = ?"
+        self._select_by_id_sql = f"SELECT id, data FROM {table} WHERE id = ?"
+        self._select_all_sql = f"SELECT id, data FROM {table} ORDER BY seq"
+        self._select_page_sql = (
+            f"SELECT seq, id, data FROM {table} WHERE seq > ? ORDER BY seq LIMIT ?")
+
+    def _touch(self, connection):
+        # Within the write transaction, so no other process can write
+        # between the version read and the bump
+        self._sync(connection)
+        connection.execute(
+            "UPDATE hbnb_versions SET version = version + 1, modified = ? WHERE name = ?",
+            (datetime.now().isoformat(), self._table))
+        with self._lock:
+            self._version += 1
+
+    def _sync(self, connection):
+        """Forget the loaded objects if the table was written by another
+        process since this one last read or wrote it"""
+        version = connection.execute(
+            "SELECT version FROM hbnb_versions WHERE name = ?", (self._table,)).fetchone()[0]
+        with self._lock:
+            # Versions only grow, a thread reading before another one's
+            # write was committed sees an older one
+            if self._version is None or version > self._version:
+                if self._version is not None:
+                    self._reloads += 1
+                self._identity_map.clear()
+                self._version = version
+
+    def _row(self, obj):
+        """Values for the insert statement: id, record, indexed columns"""
+        return ((obj.id, json.dumps(self._encode(obj)))
+                + tuple(getattr(obj, attr_name) for attr_name in self._indexed))
+
+    def _load(self, obj_id, data):
+        # Checked and filled at once, so two threads loading the same row
+        # get the same object
+        with self._lock:
+            obj = self._identity_map.get(obj_id)
+            if obj is None:
+                obj = self._decode(json.loads(data))
+                self._identity_map[obj_id] = obj
+            return obj
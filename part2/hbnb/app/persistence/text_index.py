@@ -0,0 +1,117 @@
+'''
+This module defines an inverted index used for full-text search, ranked with BM25.
+'''
+import math
+import re
+import unicodedata
+
+_WORD = re.compile(r"\w+")
+
+STOP_WORDS = frozenset("""
+    a an and are as at be but by for from has have in is it its of on or
+    the this that to was were will with
+""".split())
+
+
+def tokenize(text):
+    """Split text into searchable terms: accents removed, case folded,
+    stop words and single characters dropped"""
+    if not text.isascii():
+        # ASCII text has no accents, most texts skip this
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return [term for term in _WORD.findall(text.casefold())
+            if len(term) > 1 and term not in STOP_WORDS]
+
+
+class TextIndex:
+    """Index documents made of several texts (a title, a description, one
+    text per review...) so each text can be replaced or removed alone
+    without retokenizing the whole document"""
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> {doc_id: term frequency}
+        self._postings = {}
+        # doc_id -> {source: {term: frequency}}
+        self._sources = {}
+        # doc_id -> number of terms, for length normalization
+        self._lengths = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def set_text(self, doc_id, source, text, weight=1):
+        """Index text as the source part of a document, replacing what that
+        source held. weight multiplies the term frequencies, to boost
+        fields like titles."""
+        self.remove_text(doc_id, source)
+
+        # Counted by hand, Counter is several times slower on short texts
+        terms = {}
+        for term in tokenize(text):
+            terms[term] = terms.get(term, 0) + weight
+        if not terms:
+            return
+
+        self._sources.setdefault(doc_id, {})[source] = terms
+        for term, count in terms.items():
+            postings = self._postings.setdefault(term, {})
+            postings[doc_id] = postings.get(doc_id, 0) + count
+        self._add_length(doc_id, sum(terms.values()))
+
+    def remove_text(self, doc_id, source):
+        sources = self._sources.get(doc_id)
+        terms = sources.pop(source, None) if sources else None
+        if terms is None:
+            return
+        if not sources:
+            del self._sources[doc_id]
+
+        for term, count in terms.items():
+            postings = self._postings[term]
+            postings[doc_id] -= count
+            if not postings[doc_id]:
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[term]
+        self._add_length(doc_id, -sum(terms.values()))
+
+    def remove(self, doc_id):
+        """Remove every text of a document"""
+        for source in list(self._sources.get(doc_id, ())):
+            self.remove_text(doc_id, source)
+
+    def search(self, query):
+        """Return {doc_id: score} for the documents holding any query term,
+        best match first. Only the posting lists of the query terms are
+        read."""
+        if not self._lengths:
+            return {}
+
+        document_count = len(self._lengths)
+        average_length = self._total_length / document_count
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            frequency = len(postings)
+            idf = math.log(1 + (document_count - frequency + 0.5) / (frequency + 0.5))
+            for doc_id, count in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0) + idf * count * (self.k1 + 1) / (count + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return dict(ranked)
+
+    def _add_length(self, doc_id, length):
+        self._total_length += length
+        new_length = self._lengths.get(doc_id, 0) + length
+        if new_length:
+            self._lengths[doc_id] = new_length
+        else:
+            self._lengths.pop(doc_id, None)
@@ -1,20 +1,205 @@
-from app.persistence.repository import InMemoryRepository
+import math
+import os
+import sys
+import threading
+from functools import partial, wraps
+from config import get_config
+from app.persistence.repository import InMemoryRepository, UniqueConstraintError
+from app.persistence.locks import ReadWriteLock, NullLock
+from app.persistence.spatial_index import GridIndex
+from app.persistence.sorted_index import SortedIndex
+from app.persistence.text_index import TextIndex
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
-from flask_restx import Namespace
+from app.models.validators import email_key
+from app.models.base_model import serialization_cache
+
+
+def exclusive(method):
+    """Run a facade method alone, for changes spanning several
+    repositories and indexes"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def shared(method):
+    """Run a facade method alongside other readers of the facade indexes"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def indexed(method):
+    """Run a facade method reading the search indexes alongside other
+    readers, once the indexes are rebuilt if another process wrote to
+    the database since they were built"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._repo_reloads() != self._indexed_reloads:
+            self._refresh_indexes()
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
-api = Namespace("users", description="User operations")
-
 class HBnBFacade:
-    def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self._lock = ReadWriteLock() if self.config.THREAD_SAFE else NullLock()
+        serialization_cache.resize(self.config.SERIALIZATION_CACHE_SIZE)
+
+        # Places reference users and amenities, reviews reference users,
+        # so durable backends have to be loaded in that order
+        self.user_repo = self._make_repository('users', 'user')
+        self.amenity_repo = self._make_repository('amenities', 'amenity')
+        self.place_repo = self._make_repository('places', 'place')
+        self.review_repo = self._make_repository('reviews', 'review')
+
+        # Secondary indexes for the lookups done on every request
+        # Emails are unique regardless of case
+        self.user_repo.create_index('email_key', unique=True)
+        self.amenity_repo.create_index('name', unique=True)
+        self.review_repo.create_index('place_id')
+
+        # Search indexes, over the objects loaded by a durable backend
+        self._rebuild_indexes()
+
+        # Warm start, when the backend has nothing to load
+        snapshot_path = self.config.SNAPSHOT_PATH
+        if snapshot_path and os.path.exists(snapshot_path) and self._is_empty():
+            self.import_snapshot(snapshot_path)
+
+        if self.config.METRICS:
+            from app.services.metrics import instrument_facade
+            instrument_facade(self)
+
+    # Repositories each collection's representation depends on
+    _COLLECTION_REPOS = {
+        'users': ('user_repo',),
+        'amenities': ('amenity_repo',),
+        'places': ('place_repo', 'user_repo', 'amenity_repo', 'review_repo'),
+        'reviews': ('review_repo', 'user_repo'),
+    }
+
+    def get_collection_version(self, collection):
+        """Return a version token and the last modification time of a
+        collection, both move whenever its representation may change"""
+        repos = [getattr(self, name) for name in self._COLLECTION_REPOS[collection]]
+        version = tuple(repo.get_version() for repo in repos)
+        last_modified = max(repo.get_last_modified() for repo in repos)
+        return version, last_modified
+
+    def _make_repository(self, name, model_name):
+        """Create the repository of one model for the configured backend,
+        behind a cache when enabled"""
+        repository = self._make_backend(name, model_name)
+        if not self.config.REPOSITORY_CACHE:
+            return repository
+        if self.config.REPOSITORY != 'sqlite':
+            raise ValueError(
+                f"The repository cache only applies to the sqlite backend, "
+                f"not {self.config.REPOSITORY}")
+
+        from app.persistence.cached_repository import CachedRepository
+
+        return CachedRepository(
+            repository,
+            max_size=self.config.REPOSITORY_CACHE_SIZE,
+            ttl=self.config.REPOSITORY_CACHE_TTL or None,
+            thread_safe=self.config.THREAD_SAFE,
+        )
+
+    def _make_backend(self, name, model_name):
+        if self.config.REPOSITORY == 'memory':
+            return InMemoryRepository(thread_safe=self.config.THREAD_SAFE)
+
+        if self.config.REPOSITORY == 'file':
+            from app.persistence import serialization
+            from app.persistence.file_repository import FileRepository
+
+            return FileRepository(
+                os.path.join(self.config.DATA_DIR, name),
+                encode=serialization.to_record,
+                decode=partial(getattr(serialization, f'{model_name}_from_record'), facade=self),
+                compact_every=self.config.WAL_COMPACT_EVERY,
+                fsync=self.config.WAL_FSYNC,
+                thread_safe=self.config.THREAD_SAFE,
+            )
+
+        if self.config.REPOSITORY == 'sqlite':
+            from app.persistence import serialization
+            from app.persistence.sqlite_repository import SQLiteRepository
+
+            directory = os.path.dirname(self.config.SQLITE_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            decode = partial(getattr(serialization, f'{model_name}_from_record'), facade=self)
+            if model_name == 'place':
+                # Places are loaded on demand, after the reviews table exists
+                decode = partial(decode, with_reviews=True)
+
+            return SQLiteRepository(
+                self.config.SQLITE_PATH,
+                name,
+                encode=serialization.to_record,
+                decode=decode,
+                thread_safe=self.config.THREAD_SAFE,
+            )
+
+        raise ValueError(f"Unknown repository backend: {self.config.REPOSITORY}")
+
+    def _rebuild_indexes(self):
+        """Build the facade-level indexes from the objects of the repositories"""
+        # Read first, writes of other processes from now on are seen by
+        # the next check even if the objects below already include them
+        self._indexed_reloads = self._repo_reloads()
+
+        # Places by location, for map searches
+        self.place_locations = GridIndex()
+        # Places by price, by average rating and
+        # amenity_id -> {place_id: None} in the order amenities were added,
+        # for place searches and listings
+        self.place_prices = SortedIndex()
+        self.place_ratings = SortedIndex()
+        self.amenity_places = {}
+        # Words of place titles, descriptions and review texts, by place
+        self.place_texts = TextIndex()
+
+        for review in self.review_repo.get_all():
+            self.place_repo.get(review.place_id).add_review(review)
+            self._index_review_text(review)
 
+        places = self.place_repo.get_all()
+        for place in places:
+            self.place_locations.insert(place.id, place.latitude, place.longitude)
+            self._index_place_text(place)
+            for amenity in place.amenities:
+                self.amenity_places.setdefault(amenity.id, {})[place.id] = None
+        # Sorting once rather than inserting the places one by one
+        self.place_prices.insert_many((place.id, place.price) for place in places)
+        self.place_ratings.insert_many((place.id, place.average_rating) for place in places)
+
+    def _repo_reloads(self):
+        """Times the search repositories dropped objects written by other
+        processes, only ever non-zero with the sqlite backend"""
+        return (self.amenity_repo.get_reloads(), self.place_repo.get_reloads(),
+                self.review_repo.get_reloads())
+
+    @exclusive
+    def _refresh_indexes(self):
+        # Another thread may have rebuilt them while this one waited
+        if self._repo_reloads() != self._indexed_reloads:
+            self._rebuild_indexes()
+
+    @exclusive
     def create_user(self, user_data):
         # Checking email uniqueness
         existing_user = self.get_user_by_email(user_data.get("email"))
@@ -23,21 +208,51 @@ class HBnBFacade:
 
         # Create the new user and add it to the repo
         new_user = User(**user_data)
-        self.user_repo.add(new_user)
+        try:
+            self.user_repo.add(new_user)
+        except UniqueConstraintError:
+            # Another writer took the email since the check above
+            raise ValueError("Email already registered")
         return new_user
 
+    @exclusive
+    def create_users_many(self, users_data):
+        """Create several users in one repository operation.
+        Returns, in order, the new user or the error for each item."""
+        emails = set()
+
+        def build(user_data):
+            # Checking email uniqueness against the store and the batch
+            email = user_data.get("email")
+            if email_key(email) in emails or self.get_user_by_email(email):
+                raise ValueError("Email already registered")
+            new_user = User(**user_data)
+            emails.add(new_user.email_key)
+            return new_user
+
+        return self._create_many(self.user_repo, users_data, build)
+
     def get_user(self, user_id):
         return self.user_repo.get(user_id)
     
-    def get_all_users(self):
+    def get_all_users(self, fields=None, expand=None):
         users = self.user_repo.get_all()
-        return [user.__dict__ for user in users]
+        return [user.to_dict(fields, expand) for user in users]
+
+    def get_users_page(self, limit, after=None):
+        """Get one page of users in creation order"""
+        return self.user_repo.get_page(limit, after)
+
+    def iter_users(self):
+        """Lazily iterate over all users in creation order"""
+        return self._iter_repo(self.user_repo)
 
     def get_user_by_email(self, email):
         if not email:
             raise ValueError("Email cannot be empty.")
-        return self.user_repo.get_by_attribute('email', email)
+        return self.user_repo.get_by_attribute('email_key', email_key(email))
     
+    @exclusive
     def update_user(self, user_id, user_data):
         user_to_update = self.get_user(user_id)
 
@@ -49,9 +264,13 @@ class HBnBFacade:
         if existing_user and existing_user.id != user_id:
             raise ValueError("Email already registered")
 
-        self.user_repo.update(user_id, user_data)
+        try:
+            self.user_repo.update(user_id, user_data)
+        except UniqueConstraintError:
+            raise ValueError("Email already registered")
         return user_to_update
 
+    @exclusive
     def create_amenity(self, amenity_data):
         # Checking amenity name uniqueness
         existing_amenity = self.amenity_repo.get_by_attribute('name', amenity_data.get('name'))
@@ -60,18 +279,43 @@ class HBnBFacade:
         new_amenity = Amenity(**amenity_data)
 
         # Create the new amenity and add it to the repo
-        self.amenity_repo.add(new_amenity)
+        try:
+            self.amenity_repo.add(new_amenity)
+        except UniqueConstraintError:
+            raise ValueError("Amenity already registered")
 
         return new_amenity
 
 
+    @exclusive
+    def create_amenities_many(self, amenities_data):
+        """Create several amenities in one repository operation.
+        Returns, in order, the new amenity or the error for each item."""
+        names = set()
+
+        def build(amenity_data):
+            # Checking name uniqueness against the store and the batch
+            name = amenity_data.get('name')
+            if name in names or self.amenity_repo.get_by_attribute('name', name):
+                raise ValueError("Amenity already registered")
+            new_amenity = Amenity(**amenity_data)
+            names.add(name)
+            return new_amenity
+
+        return self._create_many(self.amenity_repo, amenities_data, build)
+
     def get_amenity(self, amenity_id):
         return self.amenity_repo.get(amenity_id)
 
     def get_all_amenities(self):
         amenities = self.amenity_repo.get_all()
-        return [amenity.__dict__ for amenity in amenities]
+        return [amenity.to_dict() for amenity in amenities]
+
+    def get_amenities_page(self, limit, after=None):
+        """Get one page of amenities in creation order"""
+        return self.amenity_repo.get_page(limit, after)
 
+    @exclusive
     def update_amenity(self, amenity_id, amenity_data):
         amenity_to_update = self.get_amenity(amenity_id)
 
@@ -84,10 +328,14 @@ class HBnBFacade:
         if existing_amenity:
             raise ValueError("Amenity name already registered")
 
-        self.amenity_repo.update(amenity_id, amenity_data)
+        try:
+            self.amenity_repo.update(amenity_id, amenity_data)
+        except UniqueConstraintError:
+            raise ValueError("Amenity name already registered")
         return amenity_to_update
 
 
+    @exclusive
     def create_place(self, place_data):
         # Checking Owner existence
         existing_owner = self.user_repo.get_by_attribute('id', place_data.get('owner_id'))
@@ -101,13 +349,33 @@ class HBnBFacade:
         # Create the new place and add it to the repo
         new_place = Place(**place_data)
         self.place_repo.add(new_place)
+        self._index_place(new_place)
         return new_place
 
 
+    @exclusive
+    def create_places_many(self, places_data):
+        """Create several places in one repository operation.
+        Returns, in order, the new place or the error for each item."""
+        # Each distinct owner is looked up once for the whole batch
+        owners = _Resolver(self.user_repo)
+
+        def build(place_data):
+            existing_owner = owners.get(place_data.pop('owner_id', None))
+            if not existing_owner:
+                raise ValueError("Owner_ID must be valid to allow place creation.")
+            return Place(owner=existing_owner, **place_data)
+
+        results = self._create_many(self.place_repo, places_data, build)
+        for result in results:
+            if isinstance(result, Place):
+                self._index_place(result)
+        return results
+
     def get_place(self, place_id):
         return self.place_repo.get(place_id)
 
-    def get_all_places(self):
+    def get_all_places(self, fields=None, expand=None):
         """Retrieves all places"""
         places = self.place_repo.get_all()
         
@@ -115,7 +383,7 @@ class HBnBFacade:
         place_dicts = []
         for place in places:
             if hasattr(place, "to_dict"):
-                place_dicts.append(place.to_dict())
+                place_dicts.append(place.to_dict(fields, expand))
             else:
                 # Manually convert nested User and Amenity objects to dictionaries
                 place_dict = place.__dict__.copy()  # Make a copy of place's attributes
@@ -127,21 +395,85 @@ class HBnBFacade:
         
         return place_dicts
 
+    def get_places_page(self, limit, after=None):
+        """Get one page of places in creation order"""
+        return self.place_repo.get_page(limit, after)
+
+    def iter_places(self):
+        """Lazily iterate over all places in creation order"""
+        return self._iter_repo(self.place_repo)
+
     def get_place_by_id(self, place_id):
         place = self.place_repo.get_by_attribute('id', place_id)
         if place is None:
             raise ValueError(f"Place with id {place_id} does not exist")
         return place
 
+    @exclusive
     def update_place(self, place_id, place_data):
         place_to_update = self.get_place(place_id)
 
         if not place_to_update:
             raise ValueError("Place not found")
 
-        self.place_repo.update(place_id, place_data)
+        try:
+            self.place_repo.update(place_id, place_data)
+        finally:
+            # Reindexing the place even if the update failed halfway
+            self._index_place(place_to_update)
         return place_to_update
 
+    def _index_place(self, place):
+        """Add or move a place in the search indexes"""
+        self.place_locations.insert(place.id, place.latitude, place.longitude)
+        self.place_prices.insert(place.id, place.price)
+        self.place_ratings.insert(place.id, place.average_rating)
+        self._index_place_text(place)
+
+    def _index_place_text(self, place):
+        # Title words weigh more than description ones in the ranking
+        self.place_texts.set_text(place.id, 'title', place.title, weight=2)
+        self.place_texts.set_text(place.id, 'description', place.description)
+
+    def _index_review_text(self, review):
+        """Add or replace a review's text in its place's search document"""
+        self.place_texts.set_text(review.place_id, ('review', review.id), review.text)
+
+    @indexed
+    def get_places_in_area(self, min_lat, min_lon, max_lat, max_lon):
+        """Get the places inside a bounding box"""
+        # NaN and infinities fail the range checks below as well, checked
+        # first so they don't depend on how comparisons treat them
+        if not all(math.isfinite(bound) for bound in (min_lat, min_lon, max_lat, max_lon)):
+            raise ValueError("Bounding box coordinates must be finite numbers.")
+        for lat in (min_lat, max_lat):
+            if not (-90 <= lat <= 90):
+                raise ValueError("Latitude must be between -90 and 90.")
+        for lon in (min_lon, max_lon):
+            if not (-180 <= lon <= 180):
+                raise ValueError("Longitude must be between -180 and 180.")
+        if min_lat > max_lat:
+            raise ValueError("min_lat must be lower than max_lat.")
+
+        place_ids = self.place_locations.query_bbox(min_lat, min_lon, max_lat, max_lon)
+        return [self.place_repo.get(place_id) for place_id in place_ids]
+
+    @indexed
+    def get_places_near(self, lat, lon, radius_km):
+        """Get (place, distance in km) for the places around a point, closest first"""
+        if not all(math.isfinite(value) for value in (lat, lon, radius_km)):
+            raise ValueError("Latitude, longitude and radius must be finite numbers.")
+        if not (-90 <= lat <= 90):
+            raise ValueError("Latitude must be between -90 and 90.")
+        if not (-180 <= lon <= 180):
+            raise ValueError("Longitude must be between -180 and 180.")
+        if radius_km <= 0:
+            raise ValueError("Radius must be positive.")
+
+        return [(self.place_repo.get(place_id), distance)
+                for place_id, distance in self.place_locations.query_radius(lat, lon, radius_km)]
+
+    @exclusive
     def add_amenity_to_place(self, place_id, amenity_name):
         # Check place existence
         place_to_amend = self.place_repo.get(place_id)
@@ -154,9 +486,113 @@ class HBnBFacade:
            raise ValueError("Amenity not found")
         
         place_to_amend.add_amenity(existing_amenity)
+        # Recording the change, as durable backends only see repository calls
+        self.place_repo.update(place_id, {})
+        self.amenity_places.setdefault(existing_amenity.id, {})[place_id] = None
+
+    @exclusive
+    def remove_amenity_from_place(self, place_id, amenity_id):
+        place_to_amend = self.place_repo.get(place_id)
+        if not place_to_amend:
+            raise ValueError("Place not found")
+
+        existing_amenity = self.amenity_repo.get(amenity_id)
+        if not existing_amenity:
+            raise ValueError("Amenity not found")
+
+        place_to_amend.remove_amenity(existing_amenity)
+        # Recording the change, as durable backends only see repository calls
+        self.place_repo.update(place_id, {})
+        self.amenity_places.get(amenity_id, {}).pop(place_id, None)
+        return place_to_amend
+
+    @indexed
+    def get_places_by_amenity(self, amenity_id):
+        """Get the places having an amenity, in the order it was added to them"""
+        if not self.amenity_repo.get(amenity_id):
+            raise ValueError("Amenity not found")
+        return [self.place_repo.get(place_id)
+                for place_id in list(self.amenity_places.get(amenity_id, ()))]
+
+    @indexed
+    def search_places(self, min_price=None, max_price=None, amenity_names=None,
+                      min_rating=None, sort=None, query=None, limit=None, offset=0):
+        """Get the places matching every given criterion, best text match,
+        cheapest or best rated first (by default the best text match when
+        there is a query, the cheapest otherwise). Each criterion gives a
+        candidate set, the smallest one is walked and the others are only
+        used for membership checks. Only the limit places from offset on
+        are loaded."""
+        if sort is None:
+            sort = 'relevance' if query is not None else 'price'
+        if sort not in ('price', 'rating', 'relevance'):
+            raise ValueError("sort must be 'price', 'rating' or 'relevance'.")
+        if sort == 'relevance' and query is None:
+            raise ValueError("sort by relevance needs a query.")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("min_price must be lower than max_price.")
+        if min_rating is not None and not (1 <= min_rating <= 5):
+            raise ValueError("min_rating must be from 1 to 5.")
+
+        # (size, ids producer, membership check) for each criterion
+        criteria = []
+
+        if query is not None:
+            # place_id -> score, best match first
+            scores = self.place_texts.search(query)
+            if not scores:
+                return []
+            criteria.append((len(scores), lambda: list(scores), scores.__contains__))
+
+        if min_price is not None or max_price is not None:
+            low = min_price if min_price is not None else float('-inf')
+            high = max_price if max_price is not None else float('inf')
+            criteria.append((
+                self.place_prices.count_range(min_price, max_price),
+                lambda: self.place_prices.range(min_price, max_price),
+                lambda place_id: low <= self.place_prices.key_of(place_id) <= high,
+            ))
+
+        if min_rating is not None:
+            criteria.append((
+                self.place_ratings.count_range(min_rating),
+                lambda: self.place_ratings.range(min_rating),
+                lambda place_id: self.place_ratings.key_of(place_id) >= min_rating,
+            ))
+
+        for name in amenity_names or []:
+            amenity = self.amenity_repo.get_by_attribute('name', name)
+            if not amenity:
+                return []
+            place_ids = self.amenity_places.get(amenity.id, {})
+            criteria.append((
+                len(place_ids),
+                lambda place_ids=place_ids: place_ids,
+                place_ids.__contains__,
+            ))
+
+        if criteria:
+            criteria.sort(key=lambda criterion: criterion[0])
+            _, candidates, _ = criteria[0]
+            checks = [check for _, _, check in criteria[1:]]
+            matching_ids = [place_id for place_id in candidates()
+                            if all(check(place_id) for check in checks)]
+        else:
+            matching_ids = self.place_prices.range()
+
+        if sort == 'relevance':
+            matching_ids.sort(key=lambda place_id: (-scores[place_id], place_id))
+        elif sort == 'rating':
+            matching_ids.sort(key=self.place_ratings.key_of, reverse=True)
+        else:
+            matching_ids.sort(key=self.place_prices.key_of)
+
+        end = None if limit is None else offset + limit
+        return [self.place_repo.get(place_id) for place_id in matching_ids[offset:end]]
 
 
     
+    @exclusive
     def create_review(self, review_data):
         """Create a new review with valid ID and if you are not its owner"""
         reviewed_place = self.place_repo.get_by_attribute('id', review_data.get('place_id'))
@@ -168,7 +604,7 @@ class HBnBFacade:
             raise ValueError("User_ID must be valid to allow review creation.")
 
         owner = reviewed_place.owner
-        if review_author is owner:
+        if review_author.id == owner.id:
             raise ValueError("You can't review your own place.")
         
         # Replacing owner_id by its corresponding User instance
@@ -180,9 +616,46 @@ class HBnBFacade:
 
         # Appending the review to the reviewed place
         reviewed_place.add_review(new_review)
+        self.place_ratings.insert(reviewed_place.id, reviewed_place.average_rating)
+        self._index_review_text(new_review)
 
         return new_review
 
+    @exclusive
+    def create_reviews_many(self, reviews_data):
+        """Create several reviews in one repository operation.
+        Returns, in order, the new review or the error for each item."""
+        # Each distinct place and author is looked up once for the whole batch
+        places = _Resolver(self.place_repo)
+        authors = _Resolver(self.user_repo)
+
+        def build(review_data):
+            reviewed_place = places.get(review_data.get('place_id'))
+            if not reviewed_place:
+                raise ValueError("Place_ID must be valid to allow review creation.")
+
+            review_author = authors.get(review_data.pop('user_id', None))
+            if not review_author:
+                raise ValueError("User_ID must be valid to allow review creation.")
+
+            if review_author.id == reviewed_place.owner.id:
+                raise ValueError("You can't review your own place.")
+            return Review(user=review_author, **review_data)
+
+        results = self._create_many(self.review_repo, reviews_data, build)
+
+        # Appending the reviews to their places, reindexed once each
+        reviewed_places = {}
+        for result in results:
+            if isinstance(result, Review):
+                reviewed_place = places.get(result.place_id)
+                reviewed_place.add_review(result)
+                self._index_review_text(result)
+                reviewed_places[reviewed_place.id] = reviewed_place
+        for reviewed_place in reviewed_places.values():
+            self.place_ratings.insert(reviewed_place.id, reviewed_place.average_rating)
+        return results
+
     def get_review(self, review_id):
         """Get review by id"""
         return self.review_repo.get(review_id)
@@ -191,27 +664,62 @@ class HBnBFacade:
         """Get ll the reviews"""
         return (self.review_repo.get_all())
 
+    def get_reviews_page(self, limit, after=None):
+        """Get one page of reviews in creation order"""
+        return self.review_repo.get_page(limit, after)
+
+    def iter_reviews(self):
+        """Lazily iterate over all reviews in creation order"""
+        return self._iter_repo(self.review_repo)
+
     def get_reviews_by_place(self, place_id):
         """Get all the reviews for a specific place"""
         reviewed_place = self.place_repo.get(place_id)
         if not reviewed_place:
             raise ValueError(f"Place with id {place_id} not found")
         
-        reviews = [review for review in self.review_repo.get_all()
-                   if review.place_id == place_id]
-
-        return reviews
+        return self.review_repo.get_all_by_attribute('place_id', place_id)
 
+    @exclusive
     def update_review(self, review_id, review_data):
         """ Update a review if it exists"""
         review_to_update = self.get_review(review_id)
 
         if not review_to_update:
             raise ValueError("Review not found")
-        
-        self.review_repo.update(review_id, review_data)
+
+        old_place = self.place_repo.get(review_to_update.place_id)
+        new_place = self.place_repo.get(review_data.get('place_id', old_place.id))
+        if not new_place:
+            raise ValueError("Place_ID must be valid to allow review update.")
+        # Moving a review is held to the same rule as creating it
+        if new_place.owner.id == review_to_update.user.id:
+            raise ValueError("You can't review your own place.")
+        old_rating = review_to_update.rating
+        old_text = review_to_update.text
+
+        try:
+            self.review_repo.update(review_id, review_data)
+        finally:
+            # Keeping the places' rating aggregates in line with what
+            # was actually applied, even if the update failed halfway
+            if review_to_update.rating != old_rating:
+                old_place.update_review_rating(old_rating, review_to_update.rating)
+            if review_to_update.place_id != old_place.id:
+                old_place.remove_review(review_to_update)
+                # Its Last-Modified can't come from the review anymore
+                self.place_repo.update(old_place.id, {})
+                new_place.add_review(review_to_update)
+                self.place_ratings.insert(new_place.id, new_place.average_rating)
+                self.place_texts.remove_text(old_place.id, ('review', review_id))
+                self._index_review_text(review_to_update)
+            elif review_to_update.text != old_text:
+                self._index_review_text(review_to_update)
+            self.place_ratings.insert(old_place.id, old_place.average_rating)
+
         return review_to_update
 
+    @exclusive
     def delete_review(self, review_id):
         """Delete a review if it exists"""
         review = self.review_repo.get(review_id)
@@ -219,7 +727,130 @@ class HBnBFacade:
             raise ValueError("Review not found")
         self.review_repo.delete(review_id)
 
-        return True
+        reviewed_place = self.place_repo.get(review.place_id)
+        reviewed_place.remove_review(review)
+        self.place_texts.remove_text(reviewed_place.id, ('review', review_id))
+        # Its Last-Modified can't come from the review anymore
+        self.place_repo.update(reviewed_place.id, {})
+        self.place_ratings.insert(reviewed_place.id, reviewed_place.average_rating)
 
+        return True
 
-facade = HBnBFacade()
+    @shared
+    def export_snapshot(self, path):
+        """Write every user, amenity, place and review to a snapshot file.
+        Returns the number of objects written per model."""
+        from app.persistence import snapshot
+
+        return snapshot.dump(
+            path,
+            self._iter_repo(self.user_repo),
+            self._iter_repo(self.amenity_repo),
+            self._iter_repo(self.place_repo),
+            self._iter_repo(self.review_repo),
+        )
+
+    @exclusive
+    def import_snapshot(self, path):
+        """Load a snapshot written by export_snapshot into this facade,
+        which must be empty. Returns the number of objects loaded per model."""
+        from app.persistence import snapshot
+
+        if not self._is_empty():
+            raise ValueError("Snapshots can only be imported into an empty facade")
+
+        users, amenities, places, reviews = snapshot.load(path)
+        self.user_repo.add_many(users)
+        self.amenity_repo.add_many(amenities)
+        self.place_repo.add_many(places)
+        self.review_repo.add_many(reviews)
+        self._rebuild_indexes()
+
+        return {"users": len(users), "amenities": len(amenities),
+                "places": len(places), "reviews": len(reviews)}
+
+    def _is_empty(self):
+        repos = (self.user_repo, self.amenity_repo, self.place_repo, self.review_repo)
+        return not any(repo.get_page(1)[0] for repo in repos)
+
+    @staticmethod
+    def _create_many(repo, items_data, build):
+        """Build an object from each item with build(data), then add the
+        valid ones in a single repository operation. Returns, in order,
+        each new object or the exception that rejected its item."""
+        results = []
+        for item_data in items_data:
+            try:
+                if not isinstance(item_data, dict):
+                    raise ValueError("Each item must be an object.")
+                # build may pop keys, the caller's data stays untouched
+                results.append(build(dict(item_data)))
+            except (TypeError, ValueError) as e:
+                results.append(e)
+
+        repo.add_many([result for result in results if not isinstance(result, Exception)])
+        return results
+
+    @staticmethod
+    def _iter_repo(repo, batch_size=500):
+        """Walk a repository page by page, so only one page is held at a
+        time and objects added or deleted meanwhile don't break iteration"""
+        after = None
+        while True:
+            page, after = repo.get_page(batch_size, after)
+            yield from page
+            if after is None:
+                return
+
+
+class _Resolver:
+    """Memoized repository lookups by id, for batches referencing the same
+    objects many times"""
+
+    def __init__(self, repo):
+        self._repo = repo
+        self._found = {}
+
+    def get(self, obj_id):
+        if not isinstance(obj_id, str):
+            return None
+        if obj_id not in self._found:
+            self._found[obj_id] = self._repo.get(obj_id)
+        return self._found[obj_id]
+
+
+_facades = {}
+_facade_lock = threading.Lock()
+
+
+def get_facade(config=None):
+    """Return the facade built from config (the configuration get_config()
+    selects by default), built on first use and kept for the next calls"""
+    config = config or get_config()
+    facade = _facades.get(config)
+    if facade is None:
+        with _facade_lock:
+            facade = _facades.get(config)
+            if facade is None:
+                facade = _facades[config] = HBnBFacade(config)
+    return facade
+
+
+class _LazyFacade:
+    """Stand-in for the application facade, so importing the modules that
+    use it doesn't load the storage backend. Within a Flask application,
+    it is the facade built from the configuration given to create_app()."""
+
+    def __getattr__(self, name):
+        return getattr(get_facade(_app_config()), name)
+
+
+def _app_config():
+    # Flask is only imported by the application, no application without it
+    flask = sys.modules.get('flask')
+    if flask is not None and flask.has_app_context():
+        return flask.current_app.extensions.get('hbnb_config')
+    return None
+
+
+facade = _LazyFacade()
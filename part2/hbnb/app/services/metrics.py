@@ -0,0 +1,218 @@
+'''
+This module implements the opt-in instrumentation of the application:
+request latencies, facade method timings and repository operation counts,
+exposed in the Prometheus text format.
+Nothing here runs unless the METRICS setting is enabled.
+'''
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+SCAN_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+
+# Repository methods counted when called from outside the repository,
+# scans are reported by the repositories
+REPOSITORY_OPERATIONS = (
+    'add', 'add_many', 'get', 'get_all', 'get_page', 'update', 'delete',
+    'get_by_attribute', 'get_all_by_attribute',
+)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One count per bucket plus the +Inf one, not cumulative
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by metric name and label values"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # name -> (type, help text)
+        self._metrics = {}
+        # name -> {labels: value or Histogram}, labels being (key, value) pairs
+        self._series = {}
+
+    def counter(self, name, description):
+        self._declare(name, 'counter', description)
+
+    def histogram(self, name, description):
+        self._declare(name, 'histogram', description)
+
+    def inc(self, name, labels=(), amount=1):
+        with self._lock:
+            series = self._series[name]
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            series = self._series[name]
+            if labels not in series:
+                series[labels] = Histogram(buckets)
+            series[labels].observe(value)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (kind, description) in self._metrics.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in self._series[name].items():
+                    if kind == 'counter':
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+                    else:
+                        lines.extend(_render_histogram(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+    def _declare(self, name, kind, description):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = (kind, description)
+                self._series[name] = {}
+
+
+metrics = MetricsRegistry()
+metrics.histogram(
+    'hbnb_http_request_duration_seconds', 'Time spent handling requests, by endpoint')
+metrics.counter(
+    'hbnb_http_requests_total', 'Requests handled, by endpoint and status')
+metrics.histogram(
+    'hbnb_facade_call_duration_seconds', 'Time spent in HBnBFacade methods')
+metrics.counter(
+    'hbnb_facade_errors_total', 'HBnBFacade calls that raised an exception')
+metrics.counter(
+    'hbnb_repository_operations_total', 'Repository method calls')
+metrics.histogram(
+    'hbnb_repository_scan_length', 'Objects visited by lookups on non-indexed attributes')
+metrics.counter(
+    'hbnb_repository_cache_total', 'Repository cache lookups, by result')
+
+
+def instrument_facade(facade):
+    """Time the public methods of a facade and count the operations of its
+    repositories, by wrapping them on the instance only"""
+    for name in dir(type(facade)):
+        if not name.startswith('_') and callable(getattr(type(facade), name)):
+            setattr(facade, name, _timed(getattr(facade, name), name))
+
+    for repo_name in ('user_repo', 'amenity_repo', 'place_repo', 'review_repo'):
+        repo = getattr(facade, repo_name)
+        # The operations a thread is in, for each repository
+        active = threading.local()
+        for operation in REPOSITORY_OPERATIONS:
+            setattr(repo, operation,
+                    _counted(getattr(repo, operation), repo_name, operation, active))
+        repo.scan_observer = _scan_observer(repo_name)
+        if hasattr(repo, 'cache_stats'):
+            repo.cache_observer = _cache_observer(repo_name)
+
+
+def init_app(app):
+    """Record the latency of every request and serve /metrics"""
+    from flask import Response, g, request
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+            labels = (('method', request.method), ('endpoint', endpoint))
+            metrics.observe(
+                'hbnb_http_request_duration_seconds', labels, time.perf_counter() - start)
+            metrics.inc(
+                'hbnb_http_requests_total', labels + (('status', str(response.status_code)),))
+        return response
+
+    @app.route('/metrics')
+    def serve_metrics():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _timed(method, name):
+    labels = (('method', name),)
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            metrics.inc('hbnb_facade_errors_total', labels)
+            raise
+        finally:
+            metrics.observe('hbnb_facade_call_duration_seconds', labels, time.perf_counter() - start)
+    return wrapper
+
+
+def _counted(method, repo_name, operation, active):
+    labels = (('repository', repo_name), ('operation', operation))
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        # Operations built on others (update() getting the object first)
+        # are counted once, as the operation called from outside
+        if getattr(active, 'operation', None) is not None:
+            return method(*args, **kwargs)
+
+        metrics.inc('hbnb_repository_operations_total', labels)
+        active.operation = operation
+        try:
+            return method(*args, **kwargs)
+        finally:
+            active.operation = None
+    return wrapper
+
+
+def _scan_observer(repo_name):
+    def observe(attr_name, length):
+        metrics.observe(
+            'hbnb_repository_scan_length',
+            (('repository', repo_name), ('attribute', attr_name)),
+            length, SCAN_BUCKETS)
+    return observe
+
+
+def _cache_observer(repo_name):
+    hit_labels = (('repository', repo_name), ('result', 'hit'))
+    miss_labels = (('repository', repo_name), ('result', 'miss'))
+
+    def observe(hit):
+        metrics.inc('hbnb_repository_cache_total', hit_labels if hit else miss_labels)
+    return observe
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histogram(name, labels, histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    return lines
@@ -0,0 +1,215 @@
+'''
+This module implements the opt-in slow request profiler.
+
+Every request in flight is stack-sampled by a background thread, and the
+samples are kept when the request turns out slower than the threshold.
+A random fraction of requests also runs under cProfile for exact call
+counts. The last profiles are kept in a ring buffer served under
+/admin/profiles, to clients giving PROFILER_TOKEN or, without a token,
+to local clients only.
+'''
+import cProfile
+import hmac
+import io
+import ipaddress
+import itertools
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+# Frames kept per stack sample, from the innermost one
+MAX_STACK_DEPTH = 64
+# Functions listed in a cProfile report
+REPORT_LINES = 30
+
+
+class _InFlight:
+    """A request being handled, and what was recorded about it so far"""
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.start = time.perf_counter()
+        self.started_at = datetime.now()
+        self.samples = Counter()
+        self.profile = None
+
+
+class StackSampler(threading.Thread):
+    """Record the stack of every thread handling a request, periodically"""
+
+    def __init__(self, interval):
+        super().__init__(name="hbnb-stack-sampler", daemon=True)
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._busy = threading.Event()
+
+    def begin(self, request_id, record):
+        with self._lock:
+            self._requests[request_id] = record
+            self._busy.set()
+
+    def end(self, request_id):
+        with self._lock:
+            self._requests.pop(request_id, None)
+            if not self._requests:
+                self._busy.clear()
+
+    def run(self):
+        while True:
+            # Sleeping for nothing while no request is in flight
+            self._busy.wait()
+            time.sleep(self._interval)
+
+            with self._lock:
+                records = list(self._requests.values())
+            frames = sys._current_frames()
+            for record in records:
+                frame = frames.get(record.thread_id)
+                if frame is not None:
+                    record.samples[_fold(frame)] += 1
+
+
+class SlowRequestProfiler:
+    def __init__(self, threshold_ms, sample_rate, keep, interval_ms):
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self._profiles = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._sampler = StackSampler(interval_ms / 1000)
+        self._sampler.start()
+
+    def begin(self):
+        """Start watching the calling thread's request, return its record"""
+        record = _InFlight(threading.get_ident())
+
+        if self.sample_rate and random.random() < self.sample_rate:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                record.profile = profile
+            except ValueError:
+                # Another profiler is active (only one is allowed at a time)
+                pass
+
+        self._sampler.begin(id(record), record)
+        return record
+
+    def end(self, record, request, status):
+        """Stop watching a request, keep its profile if it was slow or sampled"""
+        duration = time.perf_counter() - record.start
+        self._sampler.end(id(record))
+        if record.profile is not None:
+            record.profile.disable()
+
+        slow = self.threshold and duration >= self.threshold
+        if not slow and record.profile is None:
+            return
+
+        profile = {
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "endpoint": request.url_rule.rule if request.url_rule else None,
+            "status": status,
+            "started_at": record.started_at.isoformat(),
+            "duration_ms": round(duration * 1000, 3),
+            "reason": "slow" if slow else "sampled",
+            # Folded stacks, outermost frame first, as flame graph tools take them
+            "stack_samples": dict(record.samples.most_common()),
+            "cprofile": _report(record.profile) if record.profile is not None else None,
+        }
+        with self._lock:
+            profile["id"] = next(self._ids)
+            self._profiles.append(profile)
+
+    def get_profiles(self):
+        """Return the kept profiles, most recent first"""
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get_profile(self, profile_id):
+        with self._lock:
+            return next((profile for profile in self._profiles if profile["id"] == profile_id), None)
+
+
+def init_app(app):
+    """Profile the requests of app and serve the profiles under /admin/profiles"""
+    from flask import abort, g, jsonify, request
+
+    profiler = SlowRequestProfiler(
+        app.config['PROFILER_SLOW_MS'],
+        app.config['PROFILER_SAMPLE_RATE'],
+        app.config['PROFILER_KEEP'],
+        app.config['PROFILER_INTERVAL_MS'],
+    )
+    token = app.config['PROFILER_TOKEN']
+
+    @app.before_request
+    def start_profiling():
+        if not request.path.startswith('/admin/profiles'):
+            g.profile_record = profiler.begin()
+
+    @app.after_request
+    def stop_profiling(response):
+        record = g.pop('profile_record', None)
+        if record is not None:
+            profiler.end(record, request, response.status_code)
+        return response
+
+    def check_token():
+        if token:
+            given = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(given.encode(), f'Bearer {token}'.encode()):
+                abort(401)
+        elif not _is_local(request.remote_addr):
+            abort(403)
+
+    @app.route('/admin/profiles')
+    def list_profiles():
+        check_token()
+        summaries = [
+            {key: value for key, value in profile.items()
+             if key not in ('stack_samples', 'cprofile')}
+            for profile in profiler.get_profiles()
+        ]
+        return jsonify(summaries)
+
+    @app.route('/admin/profiles/<int:profile_id>')
+    def show_profile(profile_id):
+        check_token()
+        profile = profiler.get_profile(profile_id)
+        if profile is None:
+            return {"error": "Profile not found"}, 404
+        return jsonify(profile)
+
+    app.extensions['hbnb_profiler'] = profiler
+    return profiler
+
+
+def _is_local(address):
+    try:
+        return ipaddress.ip_address(address).is_loopback
+    except ValueError:
+        return False
+
+
+def _fold(frame):
+    """Turn a frame and its callers into one "file:function:line;..." string"""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def _report(profile):
+    """The functions with the highest cumulative time, as pstats prints them"""
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).sort_stats('cumulative').print_stats(REPORT_LINES)
+    return output.getvalue()
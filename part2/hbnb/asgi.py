@@ -0,0 +1,20 @@
+'''
+ASGI entry point, for serving many concurrent keep-alive connections from a
+single process:
+
+    pip install -r requirements-asgi.txt
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+The event loop owns the connections and hands each request to a pool of
+ASGI_WORKERS threads running the Flask app, so the facade and repositories
+are made thread-safe here.
+'''
+import os
+
+os.environ.setdefault('HBNB_THREAD_SAFE', '1')
+
+from a2wsgi import WSGIMiddleware
+from app import create_app
+
+flask_app = create_app()
+app = WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_WORKERS'])
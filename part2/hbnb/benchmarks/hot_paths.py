@@ -0,0 +1,213 @@
+'''
+Benchmark the facade and API hot paths at several store sizes.
+
+Usage (from part2/hbnb):
+    python -m benchmarks.hot_paths [--sizes 1000,100000,1000000]
+                                   [--backend memory|file|sqlite]
+                                   [--output results.json] [--compare old.json]
+
+Each size runs in a fresh process holding size users, places and reviews.
+The results file records the commit and environment so runs made on
+different commits can be compared with --compare.
+'''
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DEFAULT_SIZES = "1000,100000,1000000"
+BATCH_SIZE = 1000
+AMENITY_COUNT = 20
+
+
+def timed(function, repeat):
+    """Call function() repeat times, return the duration of each call in µs"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1e6)
+    return durations
+
+
+def summary(durations):
+    durations = sorted(durations)
+    return {
+        "runs": len(durations),
+        "mean_us": round(statistics.fmean(durations), 2),
+        "p50_us": round(durations[len(durations) // 2], 2),
+        "p95_us": round(durations[int(len(durations) * 0.95)], 2),
+        "min_us": round(durations[0], 2),
+        "max_us": round(durations[-1], 2),
+    }
+
+
+def populate(facade, size):
+    """Fill the store with size users, places and reviews, through the
+    batch methods so large sizes load in reasonable time"""
+    users = []
+    for start in range(0, size, BATCH_SIZE):
+        users += facade.create_users_many([
+            {"first_name": "User", "last_name": "Bench", "email": f"user{i}@bench.com"}
+            for i in range(start, min(start + BATCH_SIZE, size))
+        ])
+
+    facade.create_amenities_many([{"name": f"Amenity{i}"} for i in range(AMENITY_COUNT)])
+
+    places = []
+    for start in range(0, size, BATCH_SIZE):
+        places += facade.create_places_many([
+            {
+                "title": f"Place {i}",
+                "description": "A place to stay",
+                "price": float(i % 500),
+                "latitude": random.uniform(-80, 80),
+                "longitude": random.uniform(-170, 170),
+                "owner_id": users[i].id,
+            }
+            for i in range(start, min(start + BATCH_SIZE, size))
+        ])
+
+    # Reviews by the next user, so nobody reviews their own place
+    for start in range(0, size, BATCH_SIZE):
+        facade.create_reviews_many([
+            {
+                "place_id": places[random.randrange(size)].id,
+                "user_id": users[(i + 1) % size].id,
+                "rating": i % 5 + 1,
+                "text": "Nice stay",
+            }
+            for i in range(start, min(start + BATCH_SIZE, size))
+        ])
+
+    return users, places
+
+
+def run_size(size, repeat):
+    """Benchmark one store size, meant to run in its own process"""
+    # Imported here so the facade is created with this process' settings
+    from app import create_app
+    from app.services.facade import facade
+
+    random.seed(size)
+    start = time.perf_counter()
+    users, places = populate(facade, size)
+    results = {"populate_s": round(time.perf_counter() - start, 2)}
+
+    # Full scans are much slower than lookups, they get fewer runs
+    scan_repeat = max(3, repeat // 100)
+    new_emails = iter(range(sys.maxsize))
+
+    benchmarks = {
+        "facade.create_user": (lambda: facade.create_user({
+            "first_name": "New", "last_name": "User",
+            "email": f"new{next(new_emails)}@bench.com"}), repeat),
+        "facade.get_all_places": (facade.get_all_places, scan_repeat),
+        "facade.get_reviews_by_place": (
+            lambda: facade.get_reviews_by_place(random.choice(places).id), repeat),
+    }
+    for name, (function, runs) in benchmarks.items():
+        results[name] = summary(timed(function, runs))
+
+    # Distinct places, so every call really adds the amenity
+    targets = random.sample(places, min(repeat, size))
+    results["facade.add_amenity_to_place"] = summary(timed(
+        lambda: facade.add_amenity_to_place(targets.pop().id, "Amenity0"), len(targets)))
+
+    client = create_app().test_client()
+    new_emails = iter(range(sys.maxsize))
+    requests = {
+        "GET /api/v1/users/<id>": lambda: client.get(
+            f"/api/v1/users/{random.choice(users).id}"),
+        "GET /api/v1/places/<id>": lambda: client.get(
+            f"/api/v1/places/{random.choice(places).id}"),
+        "GET /api/v1/places/?limit=100": lambda: client.get("/api/v1/places/?limit=100"),
+        "GET /api/v1/reviews/places/<id>/reviews": lambda: client.get(
+            f"/api/v1/reviews/places/{random.choice(places).id}/reviews"),
+        "POST /api/v1/users/": lambda: client.post("/api/v1/users/", json={
+            "first_name": "Http", "last_name": "User",
+            "email": f"http{next(new_emails)}@bench.com"}),
+    }
+    for name, request in requests.items():
+        results[name] = summary(timed(request, repeat))
+
+    return results
+
+
+def _run_in_process(size, repeat, backend):
+    """Run run_size in a fresh interpreter, with its own data directory"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ.update({
+            "HBNB_REPOSITORY": backend,
+            "HBNB_DATA_DIR": data_dir,
+            "HBNB_SQLITE_PATH": os.path.join(data_dir, "hbnb.sqlite3"),
+        })
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            return pool.apply(run_size, (size, repeat))
+
+
+def environment(backend):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": backend,
+    }
+
+
+def compare(results, baseline):
+    """Print the mean time ratio of every benchmark found in both runs"""
+    print(f"\nCompared with {baseline['environment']['commit']} (ratio > 1 is slower):")
+    for size, benchmarks in results["sizes"].items():
+        for name, stats in benchmarks.items():
+            old = baseline["sizes"].get(size, {}).get(name)
+            if isinstance(stats, dict) and isinstance(old, dict):
+                print(f"  {size:>8} {name:45} {stats['mean_us'] / old['mean_us']:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="comma-separated store sizes (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1000,
+                        help="runs of each lookup benchmark (default: %(default)s)")
+    parser.add_argument("--backend", default="memory", choices=("memory", "file", "sqlite"))
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="results file of a previous run")
+    args = parser.parse_args()
+
+    results = {"environment": environment(args.backend), "sizes": {}}
+    for size in (int(size) for size in args.sizes.split(",")):
+        print(f"Running with {size} entities...", flush=True)
+        results["sizes"][str(size)] = _run_in_process(size, args.repeat, args.backend)
+        for name, stats in results["sizes"][str(size)].items():
+            if isinstance(stats, dict):
+                print(f"  {name:45} mean {stats['mean_us']:10.1f} µs  p95 {stats['p95_us']:10.1f} µs")
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(results, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline:
+            compare(results, json.load(baseline))
+
+
+if __name__ == "__main__":
+    main()
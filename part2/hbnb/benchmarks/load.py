@@ -0,0 +1,207 @@
+'''
+Compare the WSGI and ASGI serving modes under many concurrent keep-alive
+connections.
+
+Usage (from part2/hbnb):
+    python -m benchmarks.load [--server wsgi|asgi|both] [--connections 1000]
+                              [--duration 10] [--output load-results.json]
+
+The WSGI mode is Werkzeug's threaded server (what run.py uses), the ASGI
+mode is uvicorn serving asgi.py, which needs requirements-asgi.txt. Each
+server is started on a free port and filled with places, then every
+connection fetches random places for the given duration.
+'''
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+HOST = "127.0.0.1"
+USERS = 100
+PLACES = 1000
+
+SERVERS = {
+    "wsgi": lambda port: [
+        sys.executable, "-c",
+        "from werkzeug.serving import run_simple; from app import create_app; "
+        f"run_simple('{HOST}', {port}, create_app(), threaded=True)",
+    ],
+    "asgi": lambda port: [
+        sys.executable, "-m", "uvicorn", "asgi:app",
+        "--host", HOST, "--port", str(port), "--log-level", "warning", "--backlog", "4096",
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port):
+    env = dict(os.environ, HBNB_THREAD_SAFE="1", HBNB_REPOSITORY="memory")
+    server = subprocess.Popen(SERVERS[kind](port), env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"The {kind} server exited, is it installed?")
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"The {kind} server did not start")
+
+
+def post(port, path, payload):
+    request = urllib.request.Request(
+        f"http://{HOST}:{port}{path}", data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def seed(port):
+    """Create the places fetched by the load, return their ids"""
+    users = post(port, "/api/v1/users/batch", [
+        {"first_name": "Load", "last_name": "Test", "email": f"load{i}@bench.com"}
+        for i in range(USERS)
+    ])["results"]
+    places = post(port, "/api/v1/places/batch", [
+        {
+            "title": f"Place {i}", "description": "", "price": float(i),
+            "latitude": 0.0, "longitude": 0.0, "owner_id": users[i % USERS]["id"],
+        }
+        for i in range(PLACES)
+    ])["results"]
+    return [place["id"] for place in places]
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response, return (status, keep_alive)"""
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def connection(port, place_ids, deadline, latencies, errors):
+    """Send requests one after the other on a keep-alive connection"""
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(HOST, port)
+
+            path = f"/api/v1/places/{random.choice(place_ids)}"
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode())
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors["status"] += 1
+
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+            errors["connection"] += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.1)
+
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, place_ids, connections, duration):
+    latencies = []
+    errors = {"status": 0, "connection": 0}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        connection(port, place_ids, deadline, latencies, errors) for _ in range(connections)))
+
+    latencies.sort()
+
+    def percentile(fraction):
+        return round(latencies[int(len(latencies) * fraction)] * 1000, 2) if latencies else None
+
+    return {
+        "connections": connections,
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / duration, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "errors": errors,
+    }
+
+
+def raise_file_limit():
+    """Each connection takes a file descriptor on both sides"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--server", default="both", choices=("wsgi", "asgi", "both"))
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--output", default="load-results.json")
+    args = parser.parse_args()
+
+    raise_file_limit()
+    results = {}
+    for kind in (("wsgi", "asgi") if args.server == "both" else (args.server,)):
+        port = free_port()
+        print(f"Loading the {kind} server with {args.connections} connections...", flush=True)
+        try:
+            server = start_server(kind, port)
+        except RuntimeError as e:
+            print(f"  skipped: {e}")
+            continue
+
+        try:
+            place_ids = seed(port)
+            results[kind] = asyncio.run(load(port, place_ids, args.connections, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+        stats = results[kind]
+        print(f"  {stats['requests_per_s']} req/s, p50 {stats['p50_ms']} ms, "
+              f"p99 {stats['p99_ms']} ms, errors {stats['errors']}")
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(results, output, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+'''
+Measure the memory used per Business Logic object.
+
+Usage (from part2/hbnb): python -m benchmarks.model_memory [count]
+'''
+import gc
+import sys
+import tracemalloc
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+
+
+def measure(factory, count):
+    """Return the average number of bytes allocated by factory()"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # The list holding the objects is not part of their cost
+    return (after - before - sys.getsizeof(objects)) / len(objects)
+
+
+def main(count=20000):
+    owner = User("Owner", "Example", "owner@example.com")
+    place = Place("Shared", "", 10, 0, 0, owner)
+
+    results = {
+        "User": measure(lambda i: User("John", "Doe", f"user{i}@example.com"), count),
+        "Amenity": measure(lambda i: Amenity(f"Amenity {i}"), count),
+        "Place": measure(lambda i: Place("Cosy flat", "Near the station", 80.0, 48.85, 2.35, owner), count),
+        "Review": measure(lambda i: Review(place.id, owner, 4, "Lovely stay"), count),
+    }
+
+    for model, size in results.items():
+        print(f"{model:8} {size:8.0f} bytes/object")
+    return results
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
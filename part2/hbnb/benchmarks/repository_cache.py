@@ -0,0 +1,74 @@
+'''
+Measure get_place and get_user on the sqlite backend with and without the
+repository cache, for lookups skewed towards a few hot places.
+
+Usage (from part2/hbnb): python -m benchmarks.repository_cache [lookups]
+'''
+import os
+import random
+import sys
+import tempfile
+import time
+from config import get_config
+from app.services.facade import HBnBFacade
+
+USERS = 1000
+PLACES = 10000
+# Share of the lookups going to the hot places, and how many places are hot
+HOT_SHARE = 0.9
+HOT_PLACES = 500
+
+
+def make_facade(path, cache):
+    config = type("BenchmarkConfig", (get_config(),), {
+        "REPOSITORY": "sqlite", "SQLITE_PATH": path, "METRICS": False,
+        "SNAPSHOT_PATH": None, "REPOSITORY_CACHE": cache,
+    })
+    return HBnBFacade(config)
+
+
+def seed(facade):
+    users = facade.create_users_many([
+        {"first_name": "Bench", "last_name": "User", "email": f"user{i}@bench.com"}
+        for i in range(USERS)
+    ])
+    places = facade.create_places_many([
+        {
+            "title": f"Place {i}", "description": "", "price": float(i),
+            "latitude": 0.0, "longitude": 0.0, "owner_id": users[i % USERS].id,
+        }
+        for i in range(PLACES)
+    ])
+    return [place.id for place in places]
+
+
+def run(facade, place_ids, lookups):
+    """Look places and their owners up by id, return the lookups per second"""
+    rng = random.Random(0)
+    hot = place_ids[:HOT_PLACES]
+    start = time.perf_counter()
+    for _ in range(lookups):
+        place_id = rng.choice(hot if rng.random() < HOT_SHARE else place_ids)
+        facade.get_user(facade.get_place(place_id).owner.id)
+    return lookups / (time.perf_counter() - start)
+
+
+def main(lookups=100000):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "hbnb.sqlite3")
+        place_ids = seed(make_facade(path, cache=False))
+
+        for cache in (False, True):
+            # A new facade each time, so nothing is held from the seeding
+            facade = make_facade(path, cache)
+            name = "cached" if cache else "uncached"
+            results[name] = run(facade, place_ids, lookups)
+            print(f"{name:9} {results[name]:10.0f} lookups/s")
+            if cache:
+                print(f"          {facade.place_repo.cache_stats()}")
+    return results
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,96 @@
+'''
+Compare warm starting a facade from a binary snapshot with replaying the
+creation of its objects.
+
+Usage (from part2/hbnb): python -m benchmarks.snapshot [places] [path]
+
+Each place has one review and two of ten amenities, with one user for
+every ten places.
+'''
+import os
+import sys
+import tempfile
+import time
+from config import get_config
+from app.services.facade import HBnBFacade
+
+AMENITIES = 10
+BATCH_SIZE = 1000
+
+
+def make_facade():
+    # An in-memory facade of its own, whatever the environment selects
+    config = type("BenchmarkConfig", (get_config(),), {
+        "REPOSITORY": "memory", "METRICS": False, "SNAPSHOT_PATH": None})
+    return HBnBFacade(config)
+
+
+def batches(items):
+    for start in range(0, len(items), BATCH_SIZE):
+        yield items[start:start + BATCH_SIZE]
+
+
+def replay(place_count):
+    """Create the objects through the facade, as the API would"""
+    facade = make_facade()
+    # Reviewers are not the owner of the place, so at least two users
+    user_count = max(2, place_count // 10)
+
+    users = []
+    for batch in batches([
+            {"first_name": "Bench", "last_name": "User", "email": f"user{i}@bench.com"}
+            for i in range(user_count)]):
+        users.extend(facade.create_users_many(batch))
+    amenities = facade.create_amenities_many([{"name": f"Amenity{i}"} for i in range(AMENITIES)])
+
+    places = []
+    for batch in batches([
+            {
+                "title": f"Place {i}", "description": "A place to stay", "price": float(i % 500),
+                "latitude": (i % 180) - 90.0, "longitude": (i % 360) - 180.0,
+                "owner_id": users[i % user_count].id,
+            }
+            for i in range(place_count)]):
+        places.extend(facade.create_places_many(batch))
+    for i, place in enumerate(places):
+        facade.add_amenity_to_place(place.id, amenities[i % AMENITIES].name)
+        facade.add_amenity_to_place(place.id, amenities[(i + 1) % AMENITIES].name)
+
+    for batch in batches([
+            {"text": "Lovely stay", "rating": i % 5 + 1, "user_id": users[(i + 1) % user_count].id,
+             "place_id": places[i].id}
+            for i in range(place_count)]):
+        facade.create_reviews_many(batch)
+    return facade
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(place_count=100000, path=None):
+    path = path or os.path.join(tempfile.gettempdir(), "hbnb-benchmark.snapshot")
+
+    source, replay_time = timed(replay, place_count)
+    counts, export_time = timed(source.export_snapshot, path)
+    size = os.path.getsize(path)
+
+    restored = make_facade()
+    _, import_time = timed(restored.import_snapshot, path)
+    os.remove(path)
+
+    sample = source.place_repo.get_page(1)[0][0]
+    assert restored.get_place(sample.id).to_dict() == sample.to_dict()
+
+    print(f"{sum(counts.values())} objects {counts}")
+    print(f"replay          {replay_time:8.2f} s")
+    print(f"export_snapshot {export_time:8.2f} s  {size / 1024 / 1024:.1f} MiB")
+    print(f"import_snapshot {import_time:8.2f} s")
+    return {"replay_s": replay_time, "export_s": export_time,
+            "import_s": import_time, "size_bytes": size}
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]), *sys.argv[2:3])
@@ -0,0 +1,84 @@
+'''
+Measure the cold start of the application: importing it, create_app()
+and the first request, which builds the facade and loads the backend.
+
+Usage (from part2/hbnb):
+    python -m benchmarks.startup [--repository memory|file|sqlite]
+                                 [--places 0] [--runs 5]
+
+Each run is a new interpreter. With --places, a file or sqlite backend is
+first filled with that many places (and a user for every ten) in a
+temporary directory.
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Run in each new interpreter, prints the timings as JSON
+CHILD = '''
+import json, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get("/api/v1/places/?limit=1")
+first_request = time.perf_counter()
+assert response.status_code in (200, 404), response.status_code
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (first_request - created) * 1000,
+    "total_ms": (first_request - start) * 1000,
+}))
+'''
+
+SEED = '''
+from app.services.facade import HBnBFacade
+facade = HBnBFacade()
+users = facade.create_users_many([
+    {"first_name": "Seed", "last_name": "User", "email": f"user{i}@seed.com"}
+    for i in range(max(1, %(places)d // 10))])
+for start in range(0, %(places)d, 1000):
+    facade.create_places_many([
+        {"title": f"Place {i}", "description": "A place to stay", "price": float(i),
+         "latitude": 0.0, "longitude": 0.0, "owner_id": users[i %% len(users)].id}
+        for i in range(start, min(start + 1000, %(places)d))])
+'''
+
+
+def run(code, env):
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return output.strip().splitlines()[-1] if output.strip() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--repository", default="memory", choices=("memory", "file", "sqlite"))
+    parser.add_argument("--places", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, HBNB_REPOSITORY=args.repository, HBNB_DATA_DIR=directory,
+                   HBNB_SQLITE_PATH=os.path.join(directory, "hbnb.sqlite3"))
+        if args.places:
+            run(SEED % {"places": args.places}, env)
+
+        timings = [json.loads(run(CHILD, env)) for _ in range(args.runs)]
+
+    results = {name: statistics.median(timing[name] for timing in timings)
+               for name in timings[0]}
+    print(f"{args.repository} backend, {args.places} places, median of {args.runs} runs")
+    for name, value in results.items():
+        print(f"  {name:17} {value:8.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+'''
+Measure the user creation throughput, for the model alone and through the
+facade with its email uniqueness check.
+
+Usage (from part2/hbnb): python -m benchmarks.user_creation [count]
+'''
+import sys
+import time
+from config import get_config
+from app.models.user import User
+from app.services.facade import HBnBFacade
+
+
+def throughput(function, count):
+    """Call function(i) for i in range(count), return the calls per second"""
+    start = time.perf_counter()
+    for i in range(count):
+        function(i)
+    return count / (time.perf_counter() - start)
+
+
+def main(count=100000):
+    # An in-memory facade of its own, whatever the environment selects
+    config = type("BenchmarkConfig", (get_config(),), {"REPOSITORY": "memory", "METRICS": False})
+    facade = HBnBFacade(config)
+
+    results = {
+        "User()": throughput(
+            lambda i: User("John", "Doe", f"user{i}@example.com"), count),
+        "facade.create_user": throughput(
+            lambda i: facade.create_user(
+                {"first_name": "John", "last_name": "Doe", "email": f"User{i}@Example.com"}),
+            count),
+    }
+
+    for name, rate in results.items():
+        print(f"{name:20} {rate:10.0f} users/s")
+    return results
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -4,10 +4,63 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
 
+    # Storage backend: 'memory', 'file' (append-only log in DATA_DIR)
+    # or 'sqlite' (SQLITE_PATH database)
+    REPOSITORY = os.getenv('HBNB_REPOSITORY', 'memory')
+    DATA_DIR = os.getenv('HBNB_DATA_DIR', 'data')
+    SQLITE_PATH = os.getenv('HBNB_SQLITE_PATH', os.path.join(DATA_DIR, 'hbnb.sqlite3'))
+    # Number of log entries after which a repository writes a snapshot
+    WAL_COMPACT_EVERY = int(os.getenv('HBNB_WAL_COMPACT_EVERY', '10000'))
+    # fsync the log after every write, slower but survives power losses
+    WAL_FSYNC = os.getenv('HBNB_WAL_FSYNC', '0') == '1'
+    # Keep up to REPOSITORY_CACHE_SIZE recently used objects of each
+    # repository in memory, reread after REPOSITORY_CACHE_TTL seconds so
+    # writes from other processes show up (0 keeps them until evicted,
+    # for a single process). Only for the sqlite backend, the others
+    # already serve everything from memory.
+    REPOSITORY_CACHE = os.getenv('HBNB_REPOSITORY_CACHE', '0') == '1'
+    REPOSITORY_CACHE_SIZE = int(os.getenv('HBNB_REPOSITORY_CACHE_SIZE', '10000'))
+    REPOSITORY_CACHE_TTL = float(os.getenv('HBNB_REPOSITORY_CACHE_TTL', '5'))
+    # Binary snapshot written by HBnBFacade.export_snapshot, loaded at
+    # startup when the repositories are empty
+    SNAPSHOT_PATH = os.getenv('HBNB_SNAPSHOT_PATH')
+    # Lock repositories and facade indexes, needed by threaded servers
+    THREAD_SAFE = os.getenv('HBNB_THREAD_SAFE', '0') == '1'
+    # Serve the Swagger UI at / and the API spec at /swagger.json
+    SWAGGER = os.getenv('HBNB_SWAGGER', '1') == '1'
+    # Default representations of the most recently serialized objects
+    # kept for the next requests, 0 disables the cache
+    SERIALIZATION_CACHE_SIZE = int(os.getenv('HBNB_SERIALIZATION_CACHE_SIZE', '10000'))
+    # Threads running requests in the ASGI mode (asgi.py)
+    ASGI_WORKERS = int(os.getenv('HBNB_ASGI_WORKERS', '16'))
+    # Record latencies and operation counts, served at /metrics
+    METRICS = os.getenv('HBNB_METRICS', '0') == '1'
+    # Keep profiles of requests slower than PROFILER_SLOW_MS and of a
+    # PROFILER_SAMPLE_RATE fraction of all requests, served at /admin/profiles
+    PROFILER = os.getenv('HBNB_PROFILER', '0') == '1'
+    PROFILER_SLOW_MS = float(os.getenv('HBNB_PROFILER_SLOW_MS', '500'))
+    PROFILER_SAMPLE_RATE = float(os.getenv('HBNB_PROFILER_SAMPLE_RATE', '0'))
+    PROFILER_KEEP = int(os.getenv('HBNB_PROFILER_KEEP', '50'))
+    PROFILER_INTERVAL_MS = float(os.getenv('HBNB_PROFILER_INTERVAL_MS', '5'))
+    # Bearer token required by /admin/profiles, which only answers
+    # local clients when it is not set
+    PROFILER_TOKEN = os.getenv('HBNB_PROFILER_TOKEN')
+
 class DevelopmentConfig(Config):
     DEBUG = True
 
+class ProductionConfig(Config):
+    DEBUG = False
+    # Behind a proxy every client looks local, so the profiler is
+    # only enabled along with a token
+    PROFILER = Config.PROFILER and Config.PROFILER_TOKEN is not None
+
 config = {
     'development': DevelopmentConfig,
+    'production': ProductionConfig,
     'default': DevelopmentConfig
 }
+
+def get_config():
+    """Return the configuration selected by the HBNB_ENV environment variable"""
+    return config[os.getenv('HBNB_ENV', 'default')]
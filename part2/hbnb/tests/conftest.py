@@ -0,0 +1,51 @@
+import sys
+import pytest
+from config import get_config
+
+
+def make_config(**settings):
+    """The configuration selected by the environment, with an in-memory
+    backend and the optional features off unless settings say otherwise"""
+    defaults = {
+        "REPOSITORY": "memory", "THREAD_SAFE": False, "METRICS": False,
+        "PROFILER": False, "SNAPSHOT_PATH": None, "REPOSITORY_CACHE": False,
+    }
+    return type("TestConfig", (get_config(),), {**defaults, **settings})
+
+
+@pytest.fixture
+def make_facade():
+    from app.services.facade import HBnBFacade
+
+    def factory(**settings):
+        return HBnBFacade(make_config(**settings))
+    return factory
+
+
+@pytest.fixture
+def app():
+    from app import create_app
+
+    return create_app(make_config())
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def app_facade(app):
+    """The facade the requests to app go to"""
+    from app.services.facade import get_facade
+
+    return get_facade(app.extensions['hbnb_config'])
+
+
+@pytest.fixture
+def fast_switching():
+    # Switching threads as often as possible so the race shows up quickly
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
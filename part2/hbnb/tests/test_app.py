@@ -0,0 +1,36 @@
+from app import create_app
+from app.services.metrics import metrics
+from tests.conftest import make_config
+
+USER = {"first_name": "Ada", "last_name": "Test", "email": "ada@x.com"}
+
+
+def test_each_app_uses_the_facade_of_its_configuration(tmp_path):
+    sqlite = create_app(make_config(
+        REPOSITORY="sqlite", SQLITE_PATH=str(tmp_path / "hbnb.sqlite3"))).test_client()
+    memory = create_app(make_config()).test_client()
+
+    user_id = sqlite.post("/api/v1/users/", json=USER).get_json()["id"]
+    assert sqlite.get(f"/api/v1/users/{user_id}").status_code == 200
+    assert memory.get(f"/api/v1/users/{user_id}").status_code == 404
+    assert (tmp_path / "hbnb.sqlite3").exists()
+
+
+def operation_counts(repo_name):
+    series = metrics._series['hbnb_repository_operations_total']
+    return {dict(labels)['operation']: count for labels, count in series.items()
+            if dict(labels)['repository'] == repo_name}
+
+
+def test_repository_operations_are_counted_once(make_facade):
+    facade = make_facade(METRICS=True)
+    user = facade.create_user(dict(USER))
+
+    before = operation_counts('user_repo')
+    facade.user_repo.update(user.id, {"first_name": "Grace"})
+    facade.user_repo.get_all_by_attribute('id', user.id)
+    after = operation_counts('user_repo')
+
+    changes = {operation: count - before.get(operation, 0)
+               for operation, count in after.items() if count != before.get(operation, 0)}
+    assert changes == {'update': 1, 'get_all_by_attribute': 1}
@@ -0,0 +1,36 @@
+def user_data(name, email=None):
+    return {"first_name": name, "last_name": "Test", "email": email or f"{name}@x.com"}
+
+
+def test_partial_batch_reports_each_item_error(client, app_facade):
+    response = client.post("/api/v1/users/batch", json=[
+        user_data("Alice"), user_data("Bob", "not-an-email"), user_data("Carol", "alice@x.com"),
+        "Dave", user_data("Erin"),
+    ])
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert body["created"] == 2
+    results = body["results"]
+    assert [result.get("email") for result in results[::4]] == ["Alice@x.com", "Erin@x.com"]
+    assert all(set(result) == {"error"} for result in results[1:4])
+    assert results[2]["error"] == "Email already registered"
+    assert results[3]["error"] == "Each item must be an object."
+    # Only the valid items were stored
+    assert sorted(user.email for user in app_facade.user_repo.get_all()) == [
+        "Alice@x.com", "Erin@x.com"]
+
+
+def test_batch_without_valid_item_is_rejected(client, app_facade):
+    response = client.post("/api/v1/users/batch", json=[user_data("Bob", "not-an-email"), 42])
+
+    assert response.status_code == 400
+    assert response.get_json()["created"] == 0
+    assert list(app_facade.user_repo.get_all()) == []
+
+
+def test_complete_batch_is_created(client):
+    response = client.post("/api/v1/amenities/batch", json=[{"name": "Wifi"}, {"name": "Pool"}])
+
+    assert response.status_code == 201
+    assert [amenity["name"] for amenity in response.get_json()["results"]] == ["Wifi", "Pool"]
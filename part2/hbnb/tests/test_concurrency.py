@@ -0,0 +1,50 @@
+import threading
+import pytest
+
+
+def test_place_serialization_while_reviews_are_added(make_facade, fast_switching):
+    """GET /places/<id> serializes the place without the facade lock while
+    POST /reviews adds to it under the lock"""
+    facade = make_facade(THREAD_SAFE=True)
+    owner = facade.create_user({"first_name": "Owner", "last_name": "Test", "email": "owner@x.com"})
+    place = facade.create_place({
+        "title": "Flat", "description": "", "price": 10.0,
+        "latitude": 0.0, "longitude": 0.0, "owner_id": owner.id,
+    })
+    authors = facade.create_users_many([
+        {"first_name": "Author", "last_name": "Test", "email": f"author{i}@x.com"}
+        for i in range(2000)
+    ])
+    for i in range(200):
+        facade.add_amenity_to_place(place.id, facade.create_amenity({"name": f"Amenity{i}"}).name)
+
+    errors = []
+    done = threading.Event()
+
+    def read():
+        try:
+            while not done.is_set():
+                facade.get_place(place.id).to_json()
+                facade.get_place(place.id).to_dict(expand=frozenset({"reviews", "amenities"}))
+        except Exception as e:
+            errors.append(e)
+
+    def write():
+        try:
+            for author in authors:
+                facade.create_review({
+                    "place_id": place.id, "user_id": author.id, "rating": 5, "text": "Lovely stay",
+                })
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    threads = [threading.Thread(target=read) for _ in range(4)] + [threading.Thread(target=write)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert place.review_count == len(authors)
@@ -0,0 +1,36 @@
+def make_place(facade, title):
+    owner = facade.create_user({
+        "first_name": "Owner", "last_name": "Test", "email": f"{title.lower()}@owner.com"})
+    place = facade.create_place({
+        "title": title, "description": "", "price": 10.0,
+        "latitude": 0.0, "longitude": 0.0, "owner_id": owner.id,
+    })
+    return place, owner
+
+
+def add_review(facade, place, text):
+    author = facade.create_user({
+        "first_name": "Author", "last_name": "Test", "email": f"{text.lower()}@author.com"})
+    return facade.create_review({
+        "place_id": place.id, "user_id": author.id, "rating": 4, "text": text})
+
+
+def test_place_reviews_etag_ignores_other_places(client, app_facade):
+    place, _ = make_place(app_facade, "Cabin")
+    other, _ = make_place(app_facade, "Loft")
+    add_review(app_facade, place, "Cosy")
+
+    url = f"/api/v1/reviews/places/{place.id}/reviews"
+    etag = client.get(url).headers["ETag"]
+    add_review(app_facade, other, "Noisy")
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    add_review(app_facade, place, "Quiet")
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
+
+
+def test_place_reviews_of_unknown_place(client):
+    url = "/api/v1/reviews/places/unknown/reviews"
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 404
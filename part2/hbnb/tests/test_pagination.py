@@ -0,0 +1,49 @@
+import pytest
+
+
+@pytest.mark.parametrize("limit", ["inf", "nan", "1.5", "0", "1001", "-1", "ten"])
+def test_search_rejects_invalid_limits(client, limit):
+    response = client.get(f"/api/v1/places/search?limit={limit}")
+    assert response.status_code == 400
+
+
+def test_search_accepts_integer_limits(client):
+    assert client.get("/api/v1/places/search?limit=5").status_code == 200
+
+
+def encoded(key):
+    from app.api.v1.pagination import encode_cursor
+    return encode_cursor(key)
+
+
+@pytest.mark.parametrize("url", ["/api/v1/users/", "/api/v1/places/search"])
+def test_negative_cursors_are_rejected(client, url):
+    assert client.get(f"{url}?cursor={encoded(-5)}").status_code == 400
+
+
+def collect(client, url):
+    """Follow the Link headers from url, return every item and the pages"""
+    items, pages = [], 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert isinstance(response.get_json(), list)
+        items += response.get_json()
+        pages += 1
+        link = response.headers.get("Link")
+        url = link[1:link.index(">")] if link else None
+    return items, pages
+
+
+def test_lists_and_search_paginate_the_same_way(client, app_facade):
+    owner = app_facade.create_user({"first_name": "Owner", "last_name": "Test", "email": "o@x.com"})
+    app_facade.create_places_many([
+        {"title": f"Place {i}", "description": "", "price": float(i),
+         "latitude": 0.0, "longitude": 0.0, "owner_id": owner.id}
+        for i in range(5)
+    ])
+
+    for url in ("/api/v1/places/?limit=2", "/api/v1/places/search?limit=2"):
+        items, pages = collect(client, url)
+        assert sorted(item["title"] for item in items) == [f"Place {i}" for i in range(5)]
+        assert pages == 3
@@ -0,0 +1,26 @@
+import pytest
+from app import create_app
+from tests.conftest import make_config
+
+
+def make_client(token=None, remote_addr="127.0.0.1"):
+    client = create_app(make_config(PROFILER=True, PROFILER_TOKEN=token)).test_client()
+    client.environ_base["REMOTE_ADDR"] = remote_addr
+    return client
+
+
+@pytest.mark.parametrize("remote_addr, status", [
+    ("127.0.0.1", 200), ("::1", 200), ("10.0.0.8", 403), ("203.0.113.5", 403)])
+def test_without_token_only_local_clients(remote_addr, status):
+    client = make_client(remote_addr=remote_addr)
+    assert client.get("/admin/profiles").status_code == status
+
+
+@pytest.mark.parametrize("authorization, status", [
+    (None, 401), ("Bearer wrong", 401), ("Bearer s3cret", 200)])
+def test_with_token(authorization, status):
+    # Whatever the client address
+    client = make_client(token="s3cret", remote_addr="10.0.0.8")
+    headers = {"Authorization": authorization} if authorization else {}
+    assert client.get("/admin/profiles", headers=headers).status_code == status
+    assert client.get("/admin/profiles/1", headers=headers).status_code in (status, 404)
@@ -0,0 +1,34 @@
+import pytest
+from app.models.user import User
+from app.persistence.repository import InMemoryRepository, UniqueConstraintError
+
+
+@pytest.fixture
+def users():
+    repo = InMemoryRepository()
+    repo.create_index('email_key', unique=True)
+    return repo
+
+
+def test_update_checks_derived_unique_values(users):
+    first = User("First", "User", "first@x.com")
+    second = User("Second", "User", "second@x.com")
+    users.add_many([first, second])
+
+    with pytest.raises(UniqueConstraintError):
+        users.update(second.id, {"email": "FIRST@x.com"})
+
+    # Nothing changed, the index still finds both users
+    assert second.email == "second@x.com"
+    assert users.get_by_attribute('email_key', "first@x.com") is first
+    assert users.get_by_attribute('email_key', "second@x.com") is second
+
+
+def test_failed_validation_leaves_the_object_unchanged(users):
+    user = User("First", "User", "first@x.com")
+    users.add(user)
+
+    with pytest.raises(ValueError):
+        users.update(user.id, {"first_name": "Renamed", "email": "not an email"})
+    assert user.first_name == "First"
+    assert users.get_by_attribute('email_key', "first@x.com") is user
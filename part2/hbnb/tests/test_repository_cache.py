@@ -0,0 +1,25 @@
+import time
+import pytest
+
+
+def test_cached_reads_see_writes_from_another_process(make_facade, tmp_path):
+    """Two facades on one database stand for two processes"""
+    path = str(tmp_path / "hbnb.sqlite3")
+    reader = make_facade(REPOSITORY="sqlite", SQLITE_PATH=path,
+                         REPOSITORY_CACHE=True, REPOSITORY_CACHE_TTL=0.05)
+    writer = make_facade(REPOSITORY="sqlite", SQLITE_PATH=path)
+
+    user = writer.create_user({"first_name": "Old", "last_name": "Name", "email": "a@x.com"})
+    cached = reader.get_user(user.id)
+    assert cached.first_name == "Old"
+
+    writer.update_user(user.id, {"first_name": "New", "email": "a@x.com"})
+    time.sleep(0.1)
+    # cached is still referenced, the identity map must not hand it back
+    assert reader.get_user(user.id).first_name == "New"
+
+
+@pytest.mark.parametrize("backend", ["memory", "file"])
+def test_cache_is_rejected_for_in_memory_backends(make_facade, tmp_path, backend):
+    with pytest.raises(ValueError):
+        make_facade(REPOSITORY=backend, DATA_DIR=str(tmp_path), REPOSITORY_CACHE=True)
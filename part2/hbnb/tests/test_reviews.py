@@ -0,0 +1,76 @@
+import pytest
+
+
+def user(facade, name):
+    return facade.create_user({"first_name": name, "last_name": "Test", "email": f"{name}@x.com"})
+
+
+def place(facade, owner, title):
+    return facade.create_place({
+        "title": title, "description": "", "price": 10.0,
+        "latitude": 0.0, "longitude": 0.0, "owner_id": owner.id,
+    })
+
+
+def review(facade, author, reviewed, rating, text="Fine"):
+    return facade.create_review({
+        "place_id": reviewed.id, "user_id": author.id, "rating": rating, "text": text})
+
+
+def test_review_cannot_be_moved_onto_the_authors_place(make_facade):
+    facade = make_facade()
+    alice, bob = user(facade, "Alice"), user(facade, "Bob")
+    alices_place, bobs_place = place(facade, alice, "Cabin"), place(facade, bob, "Loft")
+    moved = review(facade, bob, alices_place, 2)
+
+    with pytest.raises(ValueError, match="your own place"):
+        facade.update_review(moved.id, {"place_id": bobs_place.id, "rating": 5})
+
+    assert moved.place_id == alices_place.id and moved.rating == 2
+    assert [r.id for r in alices_place.reviews] == [moved.id] and bobs_place.reviews == []
+    assert (alices_place.review_count, alices_place.average_rating) == (1, 2)
+    assert bobs_place.review_count == 0
+
+
+def aggregates(reviewed):
+    return reviewed.review_count, reviewed.average_rating, reviewed.rating_histogram
+
+
+def histogram(**counts):
+    return {str(stars): counts.get(f"s{stars}", 0) for stars in range(1, 6)}
+
+
+@pytest.fixture
+def reviewed(make_facade):
+    facade = make_facade()
+    alice, bob, carol = user(facade, "Alice"), user(facade, "Bob"), user(facade, "Carol")
+    cabin, loft = place(facade, alice, "Cabin"), place(facade, alice, "Loft")
+    first, second = review(facade, bob, cabin, 2), review(facade, carol, cabin, 5)
+    return facade, cabin, loft, first, second
+
+
+def test_rating_update_recomputes_aggregates(reviewed):
+    facade, cabin, _, first, _ = reviewed
+    assert aggregates(cabin) == (2, 3.5, histogram(s2=1, s5=1))
+
+    facade.update_review(first.id, {"rating": 4})
+    assert aggregates(cabin) == (2, 4.5, histogram(s4=1, s5=1))
+
+
+def test_moved_review_recomputes_both_places(reviewed):
+    facade, cabin, loft, first, _ = reviewed
+
+    facade.update_review(first.id, {"place_id": loft.id, "rating": 3})
+    assert aggregates(cabin) == (1, 5, histogram(s5=1))
+    assert aggregates(loft) == (1, 3, histogram(s3=1))
+    assert {place.id for place in facade.search_places(min_rating=3)} == {cabin.id, loft.id}
+    assert [place.id for place in facade.search_places(min_rating=4)] == [cabin.id]
+
+
+def test_deleted_review_leaves_aggregates(reviewed):
+    facade, cabin, _, first, second = reviewed
+
+    facade.delete_review(first.id)
+    assert aggregates(cabin) == (1, 5, histogram(s5=1))
+    facade.delete_review(second.id)
+    assert aggregates(cabin) == (0, 0, histogram())
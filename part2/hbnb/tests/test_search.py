@@ -0,0 +1,64 @@
+import pytest
+
+
+@pytest.mark.parametrize("query, name", [
+    ("min_price=nan", "min_price"), ("max_price=inf", "max_price"),
+    ("min_price=-inf", "min_price"), ("min_rating=nan", "min_rating")])
+def test_search_rejects_non_finite_numbers(client, query, name):
+    response = client.get(f"/api/v1/places/search?{query}")
+    assert response.status_code == 400
+    assert name in response.get_json()["error"]
+
+
+@pytest.fixture
+def listed(make_facade):
+    facade = make_facade()
+    owner = facade.create_user({"first_name": "Owner", "last_name": "Test", "email": "owner@x.com"})
+
+    def add(title, description=""):
+        return facade.create_place({
+            "title": title, "description": description, "price": 10.0,
+            "latitude": 0.0, "longitude": 0.0, "owner_id": owner.id,
+        })
+    return facade, add
+
+
+def titles(places):
+    return [place.title for place in places]
+
+
+def test_title_match_outranks_description_match(listed):
+    facade, add = listed
+    add("Quiet flat", "Cosy cabin feeling in town")
+    add("Cabin", "Quiet and small")
+    add("Loft", "Nothing to see")
+
+    assert titles(facade.search_places(query="cabin")) == ["Cabin", "Quiet flat"]
+
+
+def test_rarer_term_weighs_more(listed):
+    facade, add = listed
+    add("Sea view", "sea sea")
+    add("Sauna house", "sea")
+    for title in ("Harbour", "Beach", "Dock"):
+        add(title, "sea")
+
+    # "sauna" is in one place only, "sea" in every place
+    assert titles(facade.search_places(query="sea sauna"))[0] == "Sauna house"
+
+
+def test_shorter_document_ranks_first(listed):
+    facade, add = listed
+    add("Long", "garden " + "word " * 30)
+    add("Short", "garden view")
+
+    assert titles(facade.search_places(query="garden")) == ["Short", "Long"]
+
+
+def test_other_sort_overrides_relevance(listed):
+    facade, add = listed
+    add("Garden", "garden")
+    cheap = add("Flat", "garden")
+    facade.update_place(cheap.id, {"price": 1.0})
+
+    assert titles(facade.search_places(query="garden", sort="price")) == ["Flat", "Garden"]
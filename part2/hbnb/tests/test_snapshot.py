@@ -0,0 +1,36 @@
+def fill(facade):
+    owner, author = facade.create_users_many([
+        {"first_name": "Owner", "last_name": "Test", "email": "Owner@x.com"},
+        {"first_name": "Author", "last_name": "Test", "email": "author@x.com"},
+    ])
+    wifi = facade.create_amenity({"name": "Wifi"})
+    place = facade.create_place({
+        "title": "Old lighthouse", "description": "Sea view", "price": 80,
+        "latitude": 48.5, "longitude": -4, "owner_id": owner.id,
+    })
+    facade.add_amenity_to_place(place.id, wifi.name)
+    facade.create_review({"place_id": place.id, "user_id": author.id, "rating": 4, "text": "Windy"})
+    return place
+
+
+def test_import_restores_every_object(make_facade, tmp_path):
+    source = make_facade()
+    place = fill(source)
+    path = str(tmp_path / "hbnb.snapshot")
+    source.export_snapshot(path)
+
+    restored = make_facade()
+    assert restored.import_snapshot(path) == {
+        "users": 2, "amenities": 1, "places": 1, "reviews": 1}
+
+    for name in ("user_repo", "amenity_repo", "place_repo", "review_repo"):
+        assert ([obj.to_dict() for obj in getattr(restored, name).get_all()]
+                == [obj.to_dict() for obj in getattr(source, name).get_all()])
+    copy = restored.get_place(place.id)
+    assert (copy.created_at, copy.updated_at) == (place.created_at, place.updated_at)
+    assert isinstance(copy.price, int) and isinstance(copy.longitude, int)
+
+    # Indexes and aggregates work on the restored objects
+    assert restored.get_user_by_email("owner@X.com").id == place.owner.id
+    assert [found.id for found in restored.search_places(query="windy")] == [place.id]
+    assert copy.average_rating == 4
@@ -0,0 +1,88 @@
+import math
+import pytest
+
+NAN, INF = math.nan, math.inf
+
+
+@pytest.mark.parametrize("lat, lon, radius_km", [
+    (0, 0, NAN), (0, 0, INF), (NAN, 0, 10), (0, -INF, 10)])
+def test_nearby_rejects_non_finite_values(make_facade, lat, lon, radius_km):
+    with pytest.raises(ValueError, match="finite"):
+        make_facade().get_places_near(lat, lon, radius_km)
+
+
+@pytest.mark.parametrize("bounds", [
+    (NAN, 0, 10, 10), (0, 0, INF, 10), (0, -INF, 10, 10), (0, 0, 10, NAN)])
+def test_within_rejects_non_finite_bounds(make_facade, bounds):
+    with pytest.raises(ValueError, match="finite"):
+        make_facade().get_places_in_area(*bounds)
+
+
+@pytest.mark.parametrize("query", [
+    "nearby?lat=0&lon=0&radius_km=nan", "within?min_lat=0&min_lon=0&max_lat=inf&max_lon=10"])
+def test_spatial_endpoints_answer_non_finite_values_with_400(client, query):
+    response = client.get(f"/api/v1/places/{query}")
+    assert response.status_code == 400
+    assert "convert" not in response.get_json()["error"]
+
+
+def placed(facade, owner, title, lat, lon):
+    return facade.create_place({
+        "title": title, "description": "", "price": 10.0,
+        "latitude": lat, "longitude": lon, "owner_id": owner.id,
+    })
+
+
+@pytest.fixture
+def located(make_facade):
+    facade = make_facade()
+    owner = facade.create_user({"first_name": "Owner", "last_name": "Test", "email": "owner@x.com"})
+    return facade, lambda title, lat, lon: placed(facade, owner, title, lat, lon)
+
+
+def test_within_includes_places_on_the_box_edges(located):
+    facade, add = located
+    corner, edge = add("Corner", 10.0, 20.0), add("Edge", 5.0, 10.0)
+    add("Outside", 10.001, 15.0)
+
+    found = facade.get_places_in_area(0.0, 10.0, 10.0, 20.0)
+    assert sorted(place.title for place in found) == [corner.title, edge.title]
+
+
+def test_within_crosses_the_antimeridian(located):
+    facade, add = located
+    add("East", 0.0, 179.0), add("West", 0.0, -179.0), add("Greenwich", 0.0, 0.0)
+
+    found = facade.get_places_in_area(-1.0, 178.0, 1.0, -178.0)
+    assert sorted(place.title for place in found) == ["East", "West"]
+
+
+def test_nearby_keeps_the_radius_and_sorts_closest_first(located):
+    facade, add = located
+    # 0.1 degree of longitude on the equator is about 11.12 km
+    add("Far", 0.0, 0.101), add("Edge", 0.0, 0.1), add("Close", 0.0, 0.05)
+
+    results = facade.get_places_near(0.0, 0.0, 11.2)
+    assert [place.title for place, _ in results] == ["Close", "Edge"]
+    assert [round(distance, 2) for _, distance in results] == [5.56, 11.12]
+
+
+def test_nearby_finds_places_across_the_antimeridian(located):
+    facade, add = located
+    add("West", 0.0, -179.95)
+
+    assert [place.title for place, _ in facade.get_places_near(0.0, 179.95, 20)] == ["West"]
+
+
+@pytest.mark.parametrize("lat, lon, radius_km, message", [
+    (90.5, 0, 10, "Latitude"), (0, -180.5, 10, "Longitude"), (0, 0, 0, "Radius")])
+def test_nearby_rejects_out_of_range_values(make_facade, lat, lon, radius_km, message):
+    with pytest.raises(ValueError, match=message):
+        make_facade().get_places_near(lat, lon, radius_km)
+
+
+@pytest.mark.parametrize("bounds, message", [
+    ((-91, 0, 10, 10), "Latitude"), ((0, 0, 10, 181), "Longitude"), ((10, 0, 0, 10), "min_lat")])
+def test_within_rejects_out_of_range_bounds(make_facade, bounds, message):
+    with pytest.raises(ValueError, match=message):
+        make_facade().get_places_in_area(*bounds)
@@ -0,0 +1,65 @@
+import threading
+import pytest
+from app.models.user import User
+from app.persistence import serialization
+from app.persistence.repository import UniqueConstraintError
+from app.persistence.sqlite_repository import SQLiteRepository
+
+
+def make_users(path, thread_safe=False):
+    decode = lambda record: serialization.user_from_record(record, facade=None)
+    repo = SQLiteRepository(str(path), "users", serialization.to_record, decode,
+                            thread_safe=thread_safe)
+    repo.create_index('email_key', unique=True)
+    return repo
+
+
+def test_failed_update_leaves_object_and_row_unchanged(tmp_path):
+    users = make_users(tmp_path / "hbnb.sqlite3")
+    first = User("First", "User", "first@x.com")
+    second = User("Second", "User", "second@x.com")
+    users.add_many([first, second])
+
+    with pytest.raises(ValueError):
+        users.update(second.id, {"first_name": "Renamed", "email": "not an email"})
+    with pytest.raises(UniqueConstraintError):
+        users.update(second.id, {"first_name": "Renamed", "email": "FIRST@x.com"})
+
+    assert (second.first_name, second.email) == ("Second", "second@x.com")
+    reloaded = make_users(tmp_path / "hbnb.sqlite3").get(second.id)
+    assert (reloaded.first_name, reloaded.email) == ("Second", "second@x.com")
+
+
+def test_threads_loading_a_row_get_one_object(tmp_path, fast_switching):
+    path = tmp_path / "hbnb.sqlite3"
+    user = User("First", "User", "first@x.com")
+    make_users(path).add(user)
+
+    users = make_users(path, thread_safe=True)
+    for _ in range(50):
+        loaded = []
+        threads = [threading.Thread(target=lambda: loaded.append(users.get(user.id)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({id(obj) for obj in loaded}) == 1
+        del loaded, threads
+
+
+def test_search_sees_places_written_by_another_process(make_facade, tmp_path):
+    """Two facades on one database stand for two processes"""
+    path = str(tmp_path / "hbnb.sqlite3")
+    reader = make_facade(REPOSITORY="sqlite", SQLITE_PATH=path)
+    writer = make_facade(REPOSITORY="sqlite", SQLITE_PATH=path)
+    assert reader.search_places(query="lighthouse") == []
+
+    owner = writer.create_user({"first_name": "Owner", "last_name": "Test", "email": "o@x.com"})
+    place = writer.create_place({
+        "title": "Old lighthouse", "description": "", "price": 80.0,
+        "latitude": 48.0, "longitude": -4.0, "owner_id": owner.id,
+    })
+
+    assert [found.id for found in reader.search_places(query="lighthouse")] == [place.id]
+    assert [found.id for found in reader.get_places_in_area(47, -5, 49, -3)] == [place.id]
@@ -0,0 +1,71 @@
+import pytest
+from app.models.user import User
+from app.persistence import serialization
+from app.persistence.repository import (
+    InMemoryRepository, IndexMigrationError, UniqueConstraintError)
+from app.persistence.file_repository import FileRepository
+from app.persistence.sqlite_repository import SQLiteRepository
+
+BACKENDS = ["memory", "file", "sqlite"]
+
+
+def make_users_repository(backend, tmp_path):
+    decode = lambda record: serialization.user_from_record(record, facade=None)
+    if backend == "memory":
+        return InMemoryRepository()
+    if backend == "file":
+        return FileRepository(str(tmp_path / "users"), serialization.to_record, decode)
+    return SQLiteRepository(str(tmp_path / "hbnb.sqlite3"), "users", serialization.to_record, decode)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_unique_index_over_case_variant_duplicates(backend, tmp_path):
+    repo = make_users_repository(backend, tmp_path)
+    first = User("First", "User", "Same@x.com")
+    second = User("Second", "User", "same@X.com")
+    repo.add_many([first, second])
+
+    with pytest.raises(IndexMigrationError) as error:
+        repo.create_index('email_key', unique=True)
+    assert error.value.value == "same@x.com"
+    assert sorted(error.value.obj_ids) == sorted([first.id, second.id])
+
+    # Nothing was left half created, fixing the data lets the index exist
+    repo.update(second.id, {"email": "other@x.com"})
+    repo.create_index('email_key', unique=True)
+    assert repo.get_by_attribute('email_key', "same@x.com").id == first.id
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_case_variant_emails_conflict(make_facade, tmp_path, backend):
+    facade = make_facade(REPOSITORY=backend, DATA_DIR=str(tmp_path),
+                         SQLITE_PATH=str(tmp_path / "hbnb.sqlite3"))
+    facade.create_user({"first_name": "First", "last_name": "User", "email": "Same@x.com"})
+    with pytest.raises(ValueError):
+        facade.create_user({"first_name": "Second", "last_name": "User", "email": "sAME@x.com"})
+
+    other = facade.create_user({"first_name": "Other", "last_name": "User", "email": "other@x.com"})
+    with pytest.raises(ValueError):
+        facade.update_user(other.id, {"email": "SAME@X.COM"})
+    assert facade.get_user(other.id).email == "other@x.com"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_add_many_adds_nothing_when_one_object_breaks_a_unique_index(backend, tmp_path):
+    repo = make_users_repository(backend, tmp_path)
+    repo.create_index('email_key', unique=True)
+    existing = User("Existing", "User", "taken@x.com")
+    repo.add(existing)
+
+    fresh = User("Fresh", "User", "fresh@x.com")
+    with pytest.raises(UniqueConstraintError):
+        repo.add_many([fresh, User("Clash", "User", "TAKEN@x.com")])
+    with pytest.raises(UniqueConstraintError):
+        repo.add_many([fresh, User("Twin", "User", "FRESH@x.com")])
+
+    assert [user.id for user in repo.get_all()] == [existing.id]
+    assert repo.get(fresh.id) is None
+    assert repo.get_by_attribute('email_key', "fresh@x.com") is None
+    # The rejected batch left the index usable
+    repo.add_many([fresh])
+    assert repo.get_by_attribute('email_key', "fresh@x.com").id == fresh.id